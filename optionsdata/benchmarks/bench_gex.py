@@ -0,0 +1,46 @@
+"""Micro-benchmark for the vectorized gamma exposure engine.
+
+Run from the optionsdata directory:
+
+    python -m benchmarks.bench_gex
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from options_dashboard import ChainSnapshot, compute_gamma_exposure, time_to_expiry
+
+SPOT = 450.0
+EXPIRY = '2030-01-18'
+
+
+def synthetic_chain(n_strikes, seed=0):
+    rng = np.random.default_rng(seed)
+    strikes = np.round(np.linspace(SPOT * 0.3, SPOT * 1.7, n_strikes), 2)
+    moneyness = np.abs(strikes / SPOT - 1)
+
+    def side():
+        return pd.DataFrame({
+            'strike': strikes,
+            'volume': rng.integers(0, 5000, n_strikes).astype(float),
+            'openInterest': (rng.integers(0, 50000, n_strikes) * np.exp(-8 * moneyness)).round(),
+            'impliedVolatility': 0.15 + 0.5 * moneyness + rng.random(n_strikes) * 0.02,
+            'lastPrice': rng.random(n_strikes) * 10,
+        })
+
+    return ChainSnapshot.from_frames('SYN', EXPIRY, side(), side())
+
+
+def main():
+    t = time_to_expiry(EXPIRY)
+    print(f"{'strikes':>8} {'best ms':>9} {'median ms':>10}")
+    # ~250 is one SPY expiry, ~8,000 is every SPY expiry stacked together
+    for n_strikes in (250, 1000, 8000):
+        chain = synthetic_chain(n_strikes)
+        runs = timeit.repeat(lambda: compute_gamma_exposure(chain, SPOT, t), number=1, repeat=50)
+        print(f"{n_strikes:>8} {min(runs) * 1e3:>9.2f} {np.median(runs) * 1e3:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Correctness check and benchmark for the prefix-sum max pain calculation.
+
+Every run first compares `max_pain` against a brute-force O(n^2) reference on random
+chains (unsorted strikes, missing OI, one-sided chains) and exits non-zero on a mismatch.
+
+Run from the optionsdata directory:
+
+    python -m benchmarks.bench_max_pain
+"""
+import sys
+import timeit
+
+import numpy as np
+
+from options_dashboard import max_pain
+
+
+def total_payout(settle, strikes, call_oi, put_oi):
+    payout = 0.0
+    for strike, calls, puts in zip(strikes, np.nan_to_num(call_oi), np.nan_to_num(put_oi)):
+        payout += calls * max(settle - strike, 0) + puts * max(strike - settle, 0)
+    return payout
+
+
+def brute_force_max_pain(strikes, call_oi, put_oi):
+    best_strike, best_payout = None, None
+    for settle in sorted(strikes):
+        payout = total_payout(settle, strikes, call_oi, put_oi)
+        if best_payout is None or payout < best_payout:
+            best_strike, best_payout = settle, payout
+    return best_strike
+
+
+def random_chain(rng, n_strikes):
+    strikes = rng.permutation(np.round(rng.uniform(50, 500, n_strikes) * 2) / 2)
+    call_oi = rng.integers(0, 10000, n_strikes).astype(float)
+    put_oi = rng.integers(0, 10000, n_strikes).astype(float)
+    call_oi[rng.random(n_strikes) < 0.1] = np.nan
+    put_oi[rng.random(n_strikes) < 0.1] = np.nan
+    if rng.random() < 0.1:
+        call_oi[:] = 0
+    return strikes, call_oi, put_oi
+
+
+def check(trials=500):
+    rng = np.random.default_rng(7)
+    for trial in range(trials):
+        strikes, call_oi, put_oi = random_chain(rng, int(rng.integers(1, 60)))
+        expected = brute_force_max_pain(strikes, call_oi, put_oi)
+        actual = max_pain(strikes, call_oi, put_oi)
+        if expected is not None and (np.nansum(call_oi) + np.nansum(put_oi)) == 0:
+            expected = None  # No open interest at all: max_pain reports no answer
+        # Compare payouts rather than strikes so exact ties between strikes don't count as failures
+        if actual != expected and (actual is None or expected is None or not np.isclose(
+                total_payout(actual, strikes, call_oi, put_oi),
+                total_payout(expected, strikes, call_oi, put_oi))):
+            print(f"Mismatch on trial {trial}: max_pain={actual}, brute force={expected}")
+            return False
+    print(f"max_pain matches the brute-force reference on {trials} random chains")
+    return True
+
+
+def main():
+    if not check():
+        sys.exit(1)
+    rng = np.random.default_rng(0)
+    print(f"{'strikes':>8} {'prefix ms':>10} {'brute ms':>9}")
+    for n_strikes in (250, 1000, 8000):
+        strikes, call_oi, put_oi = random_chain(rng, n_strikes)
+        fast = min(timeit.repeat(lambda: max_pain(strikes, call_oi, put_oi), number=1, repeat=20))
+        brute = '-'
+        if n_strikes <= 1000:
+            brute = f"{timeit.timeit(lambda: brute_force_max_pain(strikes, call_oi, put_oi), number=1) * 1e3:.0f}"
+        print(f"{n_strikes:>8} {fast * 1e3:>10.3f} {brute:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Offline data provider that replays recorded option chain fixtures.
+
+A fixture is a JSON document holding one ticker's spot price and its chains, stored
+column-wise like the yfinance frames they were recorded from:
+
+    {"ticker": "SPY", "spot": 451.2,
+     "chains": {"2026-11-20": {"calls": {"strike": [...], "volume": [...], ...},
+                               "puts": {...}}}}
+
+`record_fixture` captures one from any provider (normally the live Yahoo provider) and
+`synthetic_fixture` builds deterministic ones of any size. `FIXTURES` names the standard
+sizes used by the benchmark suite. To record a live fixture:
+
+    python -m benchmarks.fake_provider SPY spy-recorded.json --max-expiries 12
+"""
+import argparse
+import json
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from options_dashboard import DataProvider
+
+CHAIN_COLUMNS = ('strike', 'lastPrice', 'bid', 'ask', 'volume', 'openInterest', 'impliedVolatility')
+
+
+class FakeProvider(DataProvider):
+    """Serves fixtures from memory, sleeping `latency` seconds per call to mimic the upstream round trip"""
+
+    def __init__(self, fixtures, latency=0.0):
+        self.fixtures = {fixture['ticker'].upper(): fixture for fixture in fixtures}
+        self.latency = latency
+        self.calls = 0
+
+    @classmethod
+    def from_files(cls, paths, latency=0.0):
+        fixtures = []
+        for path in paths:
+            with open(path) as f:
+                fixtures.append(json.load(f))
+        return cls(fixtures, latency)
+
+    def _fixture(self, ticker):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        fixture = self.fixtures.get(ticker.upper())
+        if fixture is None:
+            raise KeyError(f"No fixture recorded for {ticker}")
+        return fixture
+
+    def get_expiries(self, ticker):
+        return tuple(sorted(self._fixture(ticker)['chains']))
+
+    def get_option_chain(self, ticker, expiry):
+        chain = self._fixture(ticker)['chains'].get(expiry)
+        if chain is None:
+            raise ValueError(f"Expiration `{expiry}` cannot be found.")
+        return pd.DataFrame(chain['calls']), pd.DataFrame(chain['puts'])
+
+    def get_spot_price(self, ticker):
+        return self._fixture(ticker)['spot']
+
+
+def _columns(frame):
+    frame = frame.reindex(columns=CHAIN_COLUMNS)
+    return {column: [None if pd.isna(v) else float(v) for v in frame[column]] for column in CHAIN_COLUMNS}
+
+
+# Function to record a provider's current data for a ticker as a fixture
+def record_fixture(provider, ticker, path, max_expiries=None):
+    expiries = sorted(provider.get_expiries(ticker))[:max_expiries]
+    chains = {}
+    for expiry in expiries:
+        calls, puts = provider.get_option_chain(ticker, expiry)
+        chains[expiry] = {'calls': _columns(calls), 'puts': _columns(puts)}
+    fixture = {'ticker': ticker.upper(), 'spot': provider.get_spot_price(ticker), 'chains': chains}
+    with open(path, 'w') as f:
+        json.dump(fixture, f)
+    return fixture
+
+
+# Function to build a deterministic chain fixture shaped like a real one: OI and volume peak
+# near the money, IV smiles away from it and a few far strikes are listed on one side only
+def synthetic_fixture(ticker, spot, n_expiries, n_strikes, seed=0, start=None):
+    rng = np.random.default_rng(seed)
+    start = start or date.today()
+    strikes = np.round(np.linspace(spot * 0.5, spot * 1.5, n_strikes), 2)
+    moneyness = np.abs(strikes / spot - 1)
+    chains = {}
+    for i in range(n_expiries):
+        expiry = (start + timedelta(days=1 + 7 * i)).isoformat()
+
+        def side(listed):
+            k = strikes[listed]
+            m = moneyness[listed]
+            return {
+                'strike': k.tolist(),
+                'lastPrice': (np.abs(spot - k) * 0.1 + rng.random(len(k))).round(2).tolist(),
+                'bid': (np.abs(spot - k) * 0.1).round(2).tolist(),
+                'ask': (np.abs(spot - k) * 0.1 + 0.05).round(2).tolist(),
+                'volume': (rng.integers(0, 20000, len(k)) * np.exp(-20 * m)).round().tolist(),
+                'openInterest': (rng.integers(0, 80000, len(k)) * np.exp(-10 * m)).round().tolist(),
+                'impliedVolatility': (0.15 + 0.8 * m * m + rng.random(len(k)) * 0.01).tolist(),
+            }
+
+        calls_listed = strikes >= spot * 0.6
+        puts_listed = strikes <= spot * 1.4
+        chains[expiry] = {'calls': side(calls_listed), 'puts': side(puts_listed)}
+    return {'ticker': ticker.upper(), 'spot': spot, 'chains': chains}
+
+
+# Standard fixture sizes: a small chain, one shaped like SPY and a very wide synthetic chain
+FIXTURES = {
+    'small': lambda: synthetic_fixture('SMALL', 50.0, n_expiries=4, n_strikes=40, seed=1),
+    'spy': lambda: synthetic_fixture('SPY', 450.0, n_expiries=30, n_strikes=300, seed=2),
+    'wide': lambda: synthetic_fixture('WIDE', 4500.0, n_expiries=3, n_strikes=5000, seed=3),
+}
+
+
+if __name__ == '__main__':
+    from options_dashboard import YahooProvider
+
+    parser = argparse.ArgumentParser(description='Record a live option chain fixture')
+    parser.add_argument('ticker')
+    parser.add_argument('path')
+    parser.add_argument('--max-expiries', type=int, default=None)
+    args = parser.parse_args()
+    recorded = record_fixture(YahooProvider(), args.ticker, args.path, args.max_expiries)
+    print(f"Recorded {len(recorded['chains'])} expiries of {recorded['ticker']} to {args.path}")
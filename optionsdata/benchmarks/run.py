@@ -0,0 +1,156 @@
+"""Offline benchmark suite: times each stage of a dashboard request against fixture data.
+
+Stages, per fixture:
+  expiry_discovery  listing and validating expiries (cold caches, provider latency applies)
+  merge_filter      building a ChainSnapshot from raw frames and slicing the strike range
+  table_html        formatting the range as the dashboard HTML table
+  heatmap_render    rendering the strike volume heatmap PNG
+  gex_render        computing gamma exposure and rendering the GEX chart PNG
+  dashboard         a full GET / through the Flask test client (cold caches)
+
+Run from the optionsdata directory:
+
+    python -m benchmarks.run                      # compare against benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline      # record the current timings as the baseline
+    python -m benchmarks.run --fixtures small spy --latency 0.05 --repeat 3
+    python -m benchmarks.run --fixture-files spy-recorded.json   # fixtures from record_fixture
+
+Exits with status 1 when any stage is slower than its baseline by more than --tolerance, and
+with status 2 when there is no baseline to compare a stage against. Timings depend on the
+machine, so no baseline is committed: record one with --save-baseline on the machine you
+compare on.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault('RENDER_WORKERS', '0')  # time rendering itself, not process pool hand-off
+os.environ.setdefault('PREFETCH_INTERVAL', '0')  # no background upstream calls during timing
+os.environ.setdefault('SHARED_STORE_PATH', '')  # time this process's own fetches; don't touch a live store
+os.environ.setdefault('HISTORY_DIR', '')  # don't write benchmark chains into the history store
+
+import options_dashboard as od
+from benchmarks.fake_provider import FIXTURES, FakeProvider
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def time_stage(func, repeat, setup=None):
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return statistics.median(runs) * 1e3
+
+
+def bench_fixture(fixture, latency, repeat):
+    ticker, spot = fixture['ticker'], fixture['spot']
+    strike_min, strike_max = spot * 0.9, spot * 1.1
+    expiry = min(fixture['chains'])
+    provider = FakeProvider([fixture], latency)
+    od.set_provider(provider)
+    calls, puts = FakeProvider([fixture]).get_option_chain(ticker, expiry)
+    view = od.ChainSnapshot.from_frames(ticker, expiry, calls, puts).between(strike_min, strike_max)
+    client = od.app.test_client()
+
+    def render_gex():
+        snapshot = od.ChainSnapshot.from_frames(ticker, expiry, calls, puts)
+        exposure = od.compute_gamma_exposure(snapshot, spot, od.time_to_expiry(expiry))
+        chart = exposure.between(strike_min, strike_max)
+        od.render_gex_chart(chart.strikes, chart.net_gex, spot, None,
+                            chart.zero_gamma, chart.call_wall, chart.put_wall)
+
+    def dashboard():
+        response = client.get(f'/?ticker={ticker}&range={strike_min:.0f}-{strike_max:.0f}')
+        assert response.status_code == 200, response.status_code
+        response.get_data()  # the page is streamed; time the whole body
+
+    def dashboard_first_byte():
+        response = client.get(f'/?ticker={ticker}&range={strike_min:.0f}-{strike_max:.0f}')
+        next(iter(response.response))
+        response.close()
+
+    return {
+        'expiry_discovery': time_stage(lambda: od.get_available_expiries(ticker), repeat, od.clear_caches),
+        'merge_filter': time_stage(
+            lambda: od.ChainSnapshot.from_frames(ticker, expiry, calls, puts).between(strike_min, strike_max),
+            repeat),
+        'table_html': time_stage(lambda: od.format_options_table(view), repeat),
+        'heatmap_render': time_stage(
+            lambda: od.render_heatmap(view.strikes, view.call_volume, view.put_volume), repeat),
+        'gex_render': time_stage(render_gex, repeat),
+        'dashboard': time_stage(dashboard, repeat, od.clear_caches),
+        'dashboard_first_byte': time_stage(dashboard_first_byte, repeat, od.clear_caches),
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    missing = []
+    print(f"{'fixture':<8} {'stage':<17} {'ms':>10} {'baseline':>10} {'change':>8}")
+    for fixture, stages in results.items():
+        for stage, ms in stages.items():
+            base = baseline.get(fixture, {}).get(stage)
+            change = ''
+            if not base:
+                missing.append((fixture, stage))
+                change = 'no base'
+            else:
+                ratio = ms / base - 1
+                change = f"{ratio:+.0%}"
+                if ratio > tolerance:
+                    regressions.append((fixture, stage, ms, base))
+                    change += ' !'
+            base = f"{base:.1f}" if base else '-'
+            print(f"{fixture:<8} {stage:<17} {ms:>10.1f} {base:>10} {change:>8}")
+    return regressions, missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', nargs='+', choices=sorted(FIXTURES), default=sorted(FIXTURES))
+    parser.add_argument('--fixture-files', nargs='+', default=[], help='recorded fixture JSON files to add')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds of injected latency per upstream call')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown vs baseline, e.g. 0.25 = 25%%')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    fixtures = {name: FIXTURES[name]() for name in args.fixtures}
+    for path in args.fixture_files:
+        with open(path) as f:
+            fixtures[os.path.splitext(os.path.basename(path))[0]] = json.load(f)
+    results = {name: bench_fixture(fixture, args.latency, args.repeat) for name, fixture in fixtures.items()}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions, missing = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} stage(s) regressed by more than {args.tolerance:.0%}:")
+        for fixture, stage, ms, base in regressions:
+            print(f"  {fixture}/{stage}: {ms:.1f} ms vs {base:.1f} ms")
+        return 1
+    elif missing:
+        what = 'No baseline at ' + args.baseline if not baseline else f"{len(missing)} stage(s) missing from {args.baseline}"
+        print(f"{what}: nothing was checked for regressions. Record one with --save-baseline.", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,12 @@
+# Gunicorn settings, loaded automatically when gunicorn starts from this directory.
+# PRELOAD_WARMUP=1 loads the app once in the master and runs warm_up() before workers are
+# forked, so each worker starts with imports, font cache and default tickers already in memory.
+import os
+
+preload_app = os.environ.get('PRELOAD_WARMUP', '') == '1'
+
+
+def when_ready(server):
+    if preload_app:
+        from options_dashboard import warm_up
+        warm_up()
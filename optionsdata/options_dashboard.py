@@ -1,21 +1,1098 @@
 # Required libraries
-import yfinance as yf
-import pandas as pd
-from flask import Flask, request, render_template_string, Response
-from datetime import datetime, timedelta
+# yfinance, pandas, matplotlib and seaborn are imported where first used, so workers boot fast
+# and requests that never touch market data or charts (e.g. /healthz) never load them
+import numpy as np
+from flask import Flask, request, Response, jsonify, g, stream_with_context
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import queue
+import struct
+import zlib
+import gzip
+import json
+import re
+import sqlite3
+import shutil
+import signal
+import csv
 import os
 import io
-import base64
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
+import hashlib
+import threading
+import time
+import logging
+import contextvars
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from types import MappingProxyType
 
 # Flask app setup
 app = Flask(__name__)
+PROCESS_START = time.time()
 
-# HTML Template for Dashboard
-TEMPLATE = """
+# Logging: LOG_LEVEL=DEBUG brings back the per-expiry/per-fetch trace
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+                    format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logger = logging.getLogger('options_dashboard')
+
+# Option chain cache settings, overridable from the environment
+CHAIN_CACHE_TTL = float(os.environ.get('CHAIN_CACHE_TTL', 60))  # seconds
+CHAIN_CACHE_MAX_MB = float(os.environ.get('CHAIN_CACHE_MAX_MB', 256))
+
+# Rendered chart cache settings
+IMAGE_CACHE_TTL = float(os.environ.get('IMAGE_CACHE_TTL', 300))  # seconds
+IMAGE_CACHE_MAX_MB = float(os.environ.get('IMAGE_CACHE_MAX_MB', 64))
+CHART_MAX_AGE = int(os.environ.get('CHART_MAX_AGE', 30))  # browser Cache-Control max-age, seconds
+API_CACHE_MAX_MB = float(os.environ.get('API_CACHE_MAX_MB', 32))  # encoded /api response bodies
+
+# Chart output: default size and resolution, overridable per request with ?width=&dpi=&format=
+CHART_WIDTH = int(os.environ.get('CHART_WIDTH', 1600))  # pixels
+CHART_DPI = int(os.environ.get('CHART_DPI', 100))
+CHART_WIDTH_LIMITS = (400, 4000)  # pixels
+CHART_DPI_LIMITS = (50, 300)
+CHART_MIN_BAR_PX = 4  # strikes are binned so no bar or heatmap cell is thinner than this
+CHART_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml', 'webp': 'image/webp'}
+
+# Chart rendering pool settings (RENDER_WORKERS=0 renders inline on the request thread)
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', 2))
+RENDER_QUEUE_SIZE = int(os.environ.get('RENDER_QUEUE_SIZE', 8))  # renders queued or running per process
+RENDER_TIMEOUT = float(os.environ.get('RENDER_TIMEOUT', 20))  # seconds
+
+# Gamma exposure settings
+RISK_FREE_RATE = float(os.environ.get('RISK_FREE_RATE', 0.0))  # annualized, continuously compounded
+CONTRACT_MULTIPLIER = 100
+MIN_TIME_TO_EXPIRY = 1 / (365 * 24)  # one hour, in years, so expiry-day gamma stays finite
+ZERO_GAMMA_RANGE = 0.2  # zero-gamma search spans spot * (1 +/- ZERO_GAMMA_RANGE)
+ZERO_GAMMA_STEPS = 41  # grid points per refinement pass
+MARKET_TZ = ZoneInfo('America/New_York')
+
+# Expiry discovery settings
+EXPIRY_CACHE_TTL = float(os.environ.get('EXPIRY_CACHE_TTL', 300))  # seconds
+EXPIRY_VALIDATION_WORKERS = int(os.environ.get('EXPIRY_VALIDATION_WORKERS', 6))
+CHAIN_FETCH_WORKERS = int(os.environ.get('CHAIN_FETCH_WORKERS', 6))  # concurrent multi-expiry chain downloads
+PAGE_FETCH_WORKERS = int(os.environ.get('PAGE_FETCH_WORKERS', 8))  # price/chain lookups run alongside expiry discovery
+MAX_EXPIRIES = 12  # Expiries offered in the dashboard selector
+AGGREGATE_DEFAULT_EXPIRIES = 6  # nearest expiries in the dashboard's aggregate chart unless the user picks more
+AGGREGATE_MAX_EXPIRIES = int(os.environ.get('AGGREGATE_MAX_EXPIRIES', 40))  # upper bound, also for "all"
+
+# Upstream resilience: cached data is served up to STALE_TTL seconds past expiry while a
+# background refresh is attempted; the circuit breaker stops calling Yahoo while it is failing
+STALE_TTL = float(os.environ.get('STALE_TTL', 3600))
+REFRESH_WORKERS = int(os.environ.get('REFRESH_WORKERS', 2))
+BREAKER_THRESHOLD = int(os.environ.get('BREAKER_THRESHOLD', 5))  # consecutive failures before opening
+BREAKER_BASE_DELAY = float(os.environ.get('BREAKER_BASE_DELAY', 5))  # seconds, doubles per failed probe
+BREAKER_MAX_DELAY = float(os.environ.get('BREAKER_MAX_DELAY', 300))
+PRICE_CACHE_TTL = float(os.environ.get('PRICE_CACHE_TTL', 15))
+QUOTE_BATCH_WINDOW = float(os.environ.get('QUOTE_BATCH_WINDOW', 0.01))  # seconds to gather concurrent quote requests
+QUOTE_BATCH_SIZE = int(os.environ.get('QUOTE_BATCH_SIZE', 50))  # tickers per upstream quote call
+
+# Store shared by all worker processes on the host (SQLite in WAL mode); empty path disables it.
+# The default lives in the app's own instance/ directory, not a world-writable temp directory.
+SHARED_STORE_PATH = os.environ.get('SHARED_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                     'instance', 'shared_cache.sqlite'))
+SHARED_LOCK_TIMEOUT = float(os.environ.get('SHARED_LOCK_TIMEOUT', 30))  # seconds a download may hold a key
+SHARED_POLL_INTERVAL = 0.05  # seconds between checks while another worker downloads
+
+# Chain history on disk, for OI/volume changes over time; empty HISTORY_DIR disables it
+HISTORY_DIR = os.environ.get('HISTORY_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history'))
+HISTORY_INTERVAL = float(os.environ.get('HISTORY_INTERVAL', 900))  # min seconds between captures of an expiry
+HISTORY_RETENTION_DAYS = int(os.environ.get('HISTORY_RETENTION_DAYS', 30))
+HISTORY_COMPACT_EVERY = 3600  # seconds between compaction runs per process
+
+# Watchlist scanner settings (scan.py and /scan)
+SCAN_WORKERS = int(os.environ.get('SCAN_WORKERS', 8))  # tickers scanned concurrently
+SCAN_RATE = float(os.environ.get('SCAN_RATE', 5))  # upstream calls per second across all scan workers; 0 = unlimited
+SCAN_TICKER_TIMEOUT = float(os.environ.get('SCAN_TICKER_TIMEOUT', 30))  # seconds per ticker
+SCAN_MAX_TICKERS = int(os.environ.get('SCAN_MAX_TICKERS', 50))  # per /scan request; use scan.py for more
+SCAN_MAX_EXPIRIES = int(os.environ.get('SCAN_MAX_EXPIRIES', 8))  # upper bound for /scan?expiries=
+SCAN_WALL_RANGE = 0.1  # OI walls are searched within spot * (1 +/- SCAN_WALL_RANGE)
+SCAN_UNUSUAL_RATIO = 3.0  # volume / OI at or above this flags a strike as unusual
+SCAN_MIN_VOLUME = 100  # ... if it also traded at least this many contracts
+SCAN_UNUSUAL_LIMIT = 5  # unusual strikes reported per ticker
+
+# Background prefetch of a watchlist: the configured tickers plus the most requested ones
+PREFETCH_INTERVAL = float(os.environ.get('PREFETCH_INTERVAL', 30))  # seconds per pass, 0 disables
+PREFETCH_TICKERS = [t.strip().upper() for t in os.environ.get('PREFETCH_TICKERS', 'SPY,QQQ,AAPL,TSLA').split(',') if t.strip()]
+PREFETCH_HOT_COUNT = int(os.environ.get('PREFETCH_HOT_COUNT', 4))  # most requested tickers added
+PREFETCH_CHAINS = int(os.environ.get('PREFETCH_CHAINS', 3))  # nearest expiries kept warm per ticker
+PREFETCH_MARKET_HOURS_ONLY = os.environ.get('PREFETCH_MARKET_HOURS_ONLY', '1') == '1'
+
+# Live mode: one chain poll per (ticker, expiry) fanned out to every Server-Sent Events subscriber.
+# Each open stream holds a gunicorn thread, so LIVE_MAX_SUBSCRIBERS stays below --threads.
+LIVE_INTERVAL = float(os.environ.get('LIVE_INTERVAL', 15))  # seconds between polls of a chain
+LIVE_MAX_SUBSCRIBERS = int(os.environ.get('LIVE_MAX_SUBSCRIBERS', 8))  # open streams per process
+LIVE_KEEPALIVE = 15  # seconds between SSE comments on an idle stream, so disconnects are noticed
+LIVE_QUEUE_SIZE = 16  # updates buffered per subscriber before it is resynced with a full snapshot
+LIVE_COLUMNS = ('call_volume', 'put_volume', 'call_oi', 'put_oi')  # what the dashboard table shows
+
+
+class Metrics:
+    """In-process counters and histograms, exported in Prometheus text format at /metrics"""
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}  # name -> (type, help, buckets)
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+
+    def counter(self, name, help_text):
+        self._meta[name] = ('counter', help_text, None)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self._meta[name] = ('histogram', help_text, tuple(buckets))
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        buckets = self._meta[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            state = self._histograms.setdefault(key, [0] * len(buckets) + [0.0, 0])
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self, collected=()):
+        """Prometheus text exposition. `collected` adds values read at scrape time, as
+        [(name, type, help, [(labels dict, value), ...]), ...]"""
+        def fmt(labels):
+            if not labels:
+                return ''
+            return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+        lines = []
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(state) for key, state in self._histograms.items()}
+        for name, (kind, help_text, buckets) in sorted(self._meta.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f'{name}{fmt(labels)} {value}')
+                continue
+            for (metric, labels), state in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(buckets, state):
+                    lines.append(f'{name}_bucket{fmt(labels + (("le", bound),))} {count}')
+                lines.append(f'{name}_bucket{fmt(labels + (("le", "+Inf"),))} {state[-1]}')
+                lines.append(f'{name}_sum{fmt(labels)} {state[-2]}')
+                lines.append(f'{name}_count{fmt(labels)} {state[-1]}')
+        for name, kind, help_text, samples in collected:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                lines.append(f'{name}{fmt(tuple(sorted(labels.items())))} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = Metrics()
+METRICS.histogram('stage_duration_seconds', 'Time spent in each stage of request handling')
+METRICS.histogram('request_duration_seconds', 'End-to-end request latency by endpoint')
+METRICS.histogram('upstream_calls_per_request', 'Upstream data provider calls made while serving one request',
+                  buckets=(0, 1, 2, 5, 10, 20, 50, 100))
+METRICS.counter('upstream_calls_total', 'Upstream data provider calls by kind and outcome')
+METRICS.counter('render_rejected_total', 'Chart renders refused because the render queue was full')
+METRICS.counter('render_timeouts_total', 'Chart renders abandoned after RENDER_TIMEOUT')
+METRICS.counter('upstream_rejected_total', 'Upstream calls refused by the open circuit breaker')
+METRICS.counter('background_refresh_total', 'Background refreshes of stale cache entries by outcome (ok, rejected, error)')
+METRICS.counter('prefetch_refresh_total', 'Watchlist entries refreshed by the prefetch scheduler')
+METRICS.counter('shared_store_loads_total', 'Cache fills from the cross-worker store or from the upstream')
+METRICS.counter('history_captures_total', 'Chain snapshots appended to the history store')
+METRICS.counter('live_updates_total', 'Live updates queued for subscribers, by kind')
+
+
+class RequestStats:
+    """Per-request upstream call count and age of the oldest data served.
+
+    Bound to a context variable for the request; worker threads see the same object
+    because work is submitted with `submit_with_context`.
+    """
+
+    def __init__(self):
+        self.upstream_calls = 0
+        self.data_age = 0.0  # seconds since the oldest piece of data used was fetched
+        self.stale = False
+        self._lock = threading.Lock()
+
+    def count_upstream_call(self, units=1):
+        with self._lock:
+            self.upstream_calls += units
+
+    def note_data(self, age, fresh):
+        with self._lock:
+            self.data_age = max(self.data_age, age)
+            self.stale = self.stale or not fresh
+
+
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class RateLimiter:
+    """Token bucket shared by threads: `rate` acquisitions per second on average, bursts up to `burst`.
+
+    `acquire` reserves a token and sleeps until it is due, so callers are spaced out evenly.
+    A `rate` of 0 or less means no limit.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
+# Rate limit applied to upstream calls made in the current context (set by the scanner)
+_upstream_limiter = contextvars.ContextVar('upstream_limiter', default=None)
+
+
+# Context manager timing one stage into stage_duration_seconds
+@contextmanager
+def span(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        METRICS.observe('stage_duration_seconds', elapsed, stage=stage)
+        logger.debug("%s took %.1f ms", stage, elapsed * 1e3)
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling the upstream while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Fails fast while the upstream is failing instead of tying up request workers.
+
+    After `threshold` consecutive failures the breaker opens for `base_delay` seconds. Once that
+    passes a single probe call is let through (half-open): success closes the breaker, failure
+    re-opens it with the delay doubled, up to `max_delay`. Nothing here ever sleeps.
+    """
+
+    def __init__(self, threshold, base_delay, max_delay):
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.failures < self.threshold:
+                return 'closed'
+            return 'open' if time.monotonic() < self.open_until or self._probing else 'half_open'
+
+    def before_call(self):
+        with self._lock:
+            if self.failures < self.threshold:
+                return
+            if time.monotonic() < self.open_until or self._probing:
+                raise UpstreamUnavailable(
+                    f"Upstream temporarily unavailable, retrying in {max(self.open_until - time.monotonic(), 0):.0f}s")
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.trips = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.threshold:
+                delay = min(self.base_delay * 2 ** self.trips, self.max_delay)
+                self.trips += 1
+                self.open_until = time.monotonic() + delay
+                logger.warning("Upstream circuit open for %.0fs after %d consecutive failures", delay, self.failures)
+
+
+UPSTREAM_BREAKER = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_BASE_DELAY, BREAKER_MAX_DELAY)
+
+
+# Function to make one timed, counted upstream call through the circuit breaker.
+# ValueError/KeyError mean the request itself was bad (e.g. unknown expiry), not that the upstream is down.
+# `units` is how many upstream requests the call costs (a batched quote fetch is one per symbol);
+# that many are counted and taken from the rate limiter.
+def upstream_call(kind, func, *args, units=1):
+    try:
+        UPSTREAM_BREAKER.before_call()
+    except UpstreamUnavailable:
+        METRICS.inc('upstream_rejected_total', kind=kind)
+        raise
+    limiter = _upstream_limiter.get()
+    if limiter is not None:
+        limiter.acquire(units)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.count_upstream_call(units)
+    with span(f'upstream_{kind}'):
+        try:
+            result = func(*args)
+        except (ValueError, KeyError):
+            UPSTREAM_BREAKER.record_success()
+            METRICS.inc('upstream_calls_total', units, kind=kind, outcome='error')
+            raise
+        except Exception:
+            UPSTREAM_BREAKER.record_failure()
+            METRICS.inc('upstream_calls_total', units, kind=kind, outcome='error')
+            raise
+    UPSTREAM_BREAKER.record_success()
+    METRICS.inc('upstream_calls_total', units, kind=kind, outcome='ok')
+    return result
+
+# Function to submit work to a thread pool carrying the current request's context along
+def submit_with_context(pool, func, *args):
+    return pool.submit(contextvars.copy_context().run, func, *args)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after being stored.
+
+    Expired entries are kept for a further `stale_ttl` seconds, invisible to `get` but
+    returned by `lookup`, so callers can serve stale data while the upstream is down.
+    """
+
+    def __init__(self, ttl, max_bytes=None, sizeof=None, stale_ttl=0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._data = OrderedDict()  # key -> (stored_at, size, value), oldest first
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        """(value, age in seconds, fresh) for a fresh or stale entry, else None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            age = time.monotonic() - entry[0]
+            if age > self.ttl + self.stale_ttl:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            fresh = age <= self.ttl
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return entry[2], age, fresh
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                if time.monotonic() - entry[0] > self.ttl + self.stale_ttl:
+                    self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, value, age=0.0):
+        """Store `value`; `age` backdates entries that were fetched earlier (e.g. by another worker)"""
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Larger than the whole cache, don't evict everything for it
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (time.monotonic() - age, size, value)
+            self.current_bytes += size
+            while self.max_bytes is not None and self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def peek(self, key):
+        """(value, age in seconds) for any stored entry, without touching stats or LRU order"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            return entry[2], time.monotonic() - entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'bytes': self.current_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale_hits': self.stale_hits,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key):
+        stored_at, size, value = self._data.pop(key)
+        self.current_bytes -= size
+
+
+class ChainSnapshot:
+    """Immutable columnar option chain: calls and puts merged on strike, strikes sorted ascending.
+
+    Every column is a read-only float array aligned with `strikes` (NaN where a side has no
+    contract at that strike). Strike-range queries return views sharing the same arrays.
+    """
+
+    # Snapshot column -> yfinance option chain column, for each side
+    FIELDS = {
+        'volume': 'volume',
+        'oi': 'openInterest',
+        'iv': 'impliedVolatility',
+        'last': 'lastPrice',
+        'bid': 'bid',
+        'ask': 'ask',
+    }
+    COLUMNS = (
+        'call_volume', 'call_oi', 'call_iv', 'call_last', 'call_bid', 'call_ask',
+        'put_volume', 'put_oi', 'put_iv', 'put_last', 'put_bid', 'put_ask',
+    )
+
+    def __init__(self, ticker, expiry, strikes, columns, has_calls, has_puts, version, fetched_at):
+        self.ticker = ticker
+        self.expiry = expiry
+        self.strikes = strikes
+        self.columns = MappingProxyType(columns)
+        self.has_calls = has_calls
+        self.has_puts = has_puts
+        self.version = version
+        self.fetched_at = fetched_at
+        for array in (strikes, *columns.values()):
+            array.flags.writeable = False
+
+    @classmethod
+    def from_frames(cls, ticker, expiry, calls, puts):
+        import pandas as pd
+        strikes = np.union1d(calls['strike'].to_numpy(dtype=float), puts['strike'].to_numpy(dtype=float))
+        columns = {}
+        for side, frame in (('call', calls), ('put', puts)):
+            positions = np.searchsorted(strikes, frame['strike'].to_numpy(dtype=float))
+            for field, source in cls.FIELDS.items():
+                values = np.full(len(strikes), np.nan)
+                if source in frame.columns:
+                    values[positions] = pd.to_numeric(frame[source], errors='coerce').to_numpy(dtype=float)
+                columns[f'{side}_{field}'] = values
+        digest = hashlib.blake2b(strikes.tobytes(), digest_size=8)
+        for name in cls.COLUMNS:
+            digest.update(columns[name].tobytes())
+        return cls(ticker.upper(), expiry, strikes, columns, not calls.empty, not puts.empty,
+                   digest.hexdigest(), time.time())
+
+    def to_bytes(self):
+        """Serialize as a JSON header line followed by the raw float64 strike and column arrays"""
+        header = {'ticker': self.ticker, 'expiry': self.expiry, 'has_calls': self.has_calls,
+                  'has_puts': self.has_puts, 'version': self.version, 'fetched_at': self.fetched_at}
+        arrays = np.vstack([self.strikes, *(self.columns[name] for name in self.COLUMNS)])
+        return json.dumps(header).encode() + b'\n' + arrays.astype(float).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        header_end = data.index(b'\n')
+        header = json.loads(data[:header_end])
+        arrays = np.frombuffer(data, dtype=float, offset=header_end + 1).reshape(len(cls.COLUMNS) + 1, -1)
+        columns = {name: arrays[i + 1] for i, name in enumerate(cls.COLUMNS)}
+        return cls(header['ticker'], header['expiry'], arrays[0], columns, header['has_calls'],
+                   header['has_puts'], header['version'], header['fetched_at'])
+
+    def __getattr__(self, name):
+        columns = self.__dict__.get('columns', {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.strikes)
+
+    @property
+    def empty(self):
+        return len(self.strikes) == 0
+
+    @property
+    def nbytes(self):
+        return int(self.strikes.nbytes + sum(array.nbytes for array in self.columns.values()))
+
+    def between(self, strike_min, strike_max):
+        """Snapshot restricted to strike_min <= strike <= strike_max (array views, no copies)"""
+        lo = np.searchsorted(self.strikes, strike_min, side='left')
+        hi = np.searchsorted(self.strikes, strike_max, side='right')
+        columns = {name: array[lo:hi] for name, array in self.columns.items()}
+        return ChainSnapshot(self.ticker, self.expiry, self.strikes[lo:hi], columns,
+                             self.has_calls, self.has_puts, self.version, self.fetched_at)
+
+
+# Shared by the dashboard, the expiry validation and the chart endpoints
+CHAIN_CACHE = TTLCache(CHAIN_CACHE_TTL, max_bytes=int(CHAIN_CACHE_MAX_MB * 1024 * 1024),
+                       sizeof=lambda snapshot: snapshot.nbytes, stale_ttl=STALE_TTL)
+
+# Validated expiry lists per ticker
+EXPIRY_CACHE = TTLCache(EXPIRY_CACHE_TTL, stale_ttl=STALE_TTL)
+
+# Spot prices per ticker
+PRICE_CACHE = TTLCache(PRICE_CACHE_TTL, stale_ttl=STALE_TTL)
+
+# Rendered chart bytes, keyed by chart kind, ticker, expiry, strike range and chain version
+IMAGE_CACHE = TTLCache(IMAGE_CACHE_TTL, max_bytes=int(IMAGE_CACHE_MAX_MB * 1024 * 1024), sizeof=len)
+
+# Serialized and compressed /api bodies, keyed like IMAGE_CACHE plus format and content-coding
+API_CACHE = TTLCache(IMAGE_CACHE_TTL, max_bytes=int(API_CACHE_MAX_MB * 1024 * 1024), sizeof=len)
+
+
+class SharedStore:
+    """Key/value store in a SQLite file (WAL mode) shared by every worker process on the host.
+
+    Entries carry the wall-clock time they were fetched so each worker can judge freshness
+    against its own TTLs. Per-key download locks live in the same file: a lock is a row that
+    expires after `lock_timeout`, so a worker that dies mid-download cannot block a key for good.
+    """
+
+    PRUNE_EVERY = 200  # writes between deletions of long-expired rows
+
+    def __init__(self, path, lock_timeout):
+        self.path = path
+        self.lock_timeout = lock_timeout
+        self.writes = 0
+        self._local = threading.local()
+        self._create_private(path)
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS entries (namespace TEXT, key TEXT, stored_at REAL,'
+                         ' value BLOB, PRIMARY KEY (namespace, key))')
+            conn.execute('CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, owner TEXT, expires_at REAL)')
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _create_private(path):
+        # Whoever can write the file decides what every worker serves: create it readable by this
+        # user only (SQLite gives the -wal/-shm files the same mode) and refuse anyone else's file
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        info = os.stat(path)
+        if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+            raise PermissionError(f"{path} is owned by another user")
+        if info.st_mode & 0o077:
+            os.chmod(path, 0o600)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @property
+    def conn(self):
+        # sqlite3 connections can't be shared between threads; workers fork, so key on the pid too
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace, key):
+        """(value bytes, age in seconds) or None"""
+        row = self.conn.execute('SELECT value, stored_at FROM entries WHERE namespace = ? AND key = ?',
+                                (namespace, key)).fetchone()
+        if row is None:
+            return None
+        return row[0], max(time.time() - row[1], 0.0)
+
+    def put(self, namespace, key, value, max_age):
+        self.conn.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)', (namespace, key, time.time(), value))
+        self.writes += 1
+        if self.writes % self.PRUNE_EVERY == 0:
+            self.conn.execute('DELETE FROM entries WHERE namespace = ? AND stored_at < ?',
+                              (namespace, time.time() - max_age))
+
+    def acquire(self, name):
+        """Take the download lock for `name` unless another live owner holds it"""
+        now = time.time()
+        owner = f'{os.getpid()}:{threading.get_ident()}'
+        cursor = self.conn.execute(
+            'INSERT INTO locks VALUES (?, ?, ?) ON CONFLICT (name) DO UPDATE SET owner = excluded.owner,'
+            ' expires_at = excluded.expires_at WHERE locks.expires_at < ?',
+            (name, owner, now + self.lock_timeout, now))
+        return cursor.rowcount == 1
+
+    def release(self, name):
+        owner = f'{os.getpid()}:{threading.get_ident()}'
+        self.conn.execute('DELETE FROM locks WHERE name = ? AND owner = ?', (name, owner))
+
+    def clear(self):
+        self.conn.execute('DELETE FROM entries')
+        self.conn.execute('DELETE FROM locks')
+
+
+class SharedNamespace:
+    """Backs one TTLCache with the shared store, downloading each key at most once across workers"""
+
+    def __init__(self, store, name, encode, decode):
+        self.store = store
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+    @staticmethod
+    def key(key):
+        return '|'.join(key) if isinstance(key, tuple) else key
+
+    def lookup(self, cache, key, older_than=None):
+        """Copy the shared entry into `cache` if it is younger than `older_than` seconds;
+        returns (value, age, fresh) like TTLCache.lookup"""
+        found = self.store.get(self.name, self.key(key))
+        limit = cache.ttl + cache.stale_ttl if older_than is None else older_than
+        if found is None or found[1] >= limit:
+            return None
+        value = self.decode(found[0])
+        cache.set(key, value, age=found[1])
+        METRICS.inc('shared_store_loads_total', namespace=self.name, source='shared')
+        return value, found[1], found[1] <= cache.ttl
+
+    def load(self, cache, key, fetch, keep, max_age):
+        """Single-flight fetch: one worker downloads while the others wait for its result"""
+        lock_name = f'{self.name}|{self.key(key)}'
+        deadline = time.monotonic() + self.store.lock_timeout
+        while time.monotonic() < deadline:
+            found = self.lookup(cache, key)
+            if found is not None and found[1] <= max_age:
+                return found[0]
+            if self.store.acquire(lock_name):
+                try:
+                    found = self.lookup(cache, key)  # written while we were acquiring
+                    if found is not None and found[1] <= max_age:
+                        return found[0]
+                    return self._fetch(cache, key, fetch, keep)
+                finally:
+                    self.store.release(lock_name)
+            time.sleep(SHARED_POLL_INTERVAL)
+        logger.warning("Gave up waiting for another worker to fetch %s %s", self.name, key)
+        return self._fetch(cache, key, fetch, keep)
+
+    def _fetch(self, cache, key, fetch, keep):
+        value = fetch()
+        METRICS.inc('shared_store_loads_total', namespace=self.name, source='upstream')
+        if keep(value):
+            cache.set(key, value)
+            self.put(cache, key, value)
+        return value
+
+    def put(self, cache, key, value):
+        self.store.put(self.name, self.key(key), self.encode(value), cache.ttl + cache.stale_ttl)
+
+
+# Function to open the shared store, falling back to per-process caching if the file can't be used
+def open_shared_store(path):
+    if not path:
+        return None
+    try:
+        return SharedStore(path, SHARED_LOCK_TIMEOUT)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("Shared store %s unavailable, caching per process: %s", path, e)
+        return None
+
+
+SHARED_STORE = None
+SHARED_NAMESPACES = {}  # cache -> SharedNamespace, see shared_namespace
+_shared_pid = None
+_shared_lock = threading.Lock()
+
+# Function to get the shared store namespace backing `cache` (None if the cache is not shared).
+# The store is opened on first use in each process: render workers import this module but never
+# touch the caches, and a forked worker must not reuse the master's SQLite connection.
+def shared_namespace(cache):
+    global SHARED_STORE, SHARED_NAMESPACES, _shared_pid
+    if _shared_pid != os.getpid():
+        with _shared_lock:
+            if _shared_pid != os.getpid():
+                SHARED_STORE = open_shared_store(SHARED_STORE_PATH)
+                SHARED_NAMESPACES = {}
+                if SHARED_STORE is not None:
+                    # Caches backed by the shared store, with how their values are serialized
+                    SHARED_NAMESPACES = {
+                        CHAIN_CACHE: SharedNamespace(SHARED_STORE, 'chain', ChainSnapshot.to_bytes,
+                                                     ChainSnapshot.from_bytes),
+                        EXPIRY_CACHE: SharedNamespace(SHARED_STORE, 'expiry', lambda value: json.dumps(value).encode(),
+                                                      lambda data: tuple(json.loads(data))),
+                        PRICE_CACHE: SharedNamespace(SHARED_STORE, 'price', lambda value: json.dumps(value).encode(),
+                                                     json.loads),
+                    }
+                _shared_pid = os.getpid()
+    return SHARED_NAMESPACES.get(cache)
+
+
+class HistoryStore:
+    """Append-only chain history: one .npy file per (ticker, expiry, capture time).
+
+    Files live in per-ticker, per-day partitions: <root>/<TICKER>/<YYYY-MM-DD>/<expiry>_<HHMMSS>.npy,
+    with dates and times in New York time. Each file holds a (1 + len(COLUMNS)) x strikes float
+    array (strikes first) written atomically, and is memory-mapped on read. Compaction keeps only
+    the last capture per expiry for past days and drops days older than `retention_days`.
+    """
+
+    COLUMNS = ('call_volume', 'call_oi', 'call_iv', 'put_volume', 'put_oi', 'put_iv')
+    TICKER_PATTERN = re.compile(r'[A-Z0-9^][A-Z0-9.=^-]{0,15}')
+    EXPIRY_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+    def __init__(self, root, interval, retention_days):
+        self.root = root
+        self.interval = interval
+        self.retention_days = retention_days
+        self.last_compacted = 0.0
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def valid_key(cls, ticker, expiry):
+        """True if the (upper-cased) ticker and expiry are safe to use as path components"""
+        return bool(cls.TICKER_PATTERN.fullmatch(ticker) and cls.EXPIRY_PATTERN.fullmatch(expiry))
+
+    def _days(self, ticker):
+        try:
+            return sorted(entry.name for entry in os.scandir(os.path.join(self.root, ticker)) if entry.is_dir())
+        except FileNotFoundError:
+            return []
+
+    def captures(self, ticker, expiry):
+        """[(captured_at, path)] for one expiry, oldest first"""
+        ticker = ticker.upper()
+        if not self.valid_key(ticker, expiry):
+            return []
+        found = []
+        for day in self._days(ticker):
+            folder = os.path.join(self.root, ticker, day)
+            for name in os.listdir(folder):
+                if name.startswith(f'{expiry}_') and name.endswith('.npy'):
+                    try:
+                        stamp = datetime.strptime(f'{day} {name[len(expiry) + 1:-4]}', '%Y-%m-%d %H%M%S')
+                    except ValueError:
+                        continue  # stray file, not one of ours
+                    found.append((stamp.replace(tzinfo=MARKET_TZ), os.path.join(folder, name)))
+        return sorted(found)
+
+    def record(self, snapshot, now=None):
+        """Append a capture unless this expiry was captured less than `interval` seconds ago"""
+        if not self.valid_key(snapshot.ticker, snapshot.expiry):
+            return False
+        now = (now or datetime.now(timezone.utc)).astimezone(MARKET_TZ)
+        previous = self.before(snapshot.ticker, snapshot.expiry, now)
+        if previous and (now - previous[0]).total_seconds() < self.interval:
+            return False
+        folder = os.path.join(self.root, snapshot.ticker, now.strftime('%Y-%m-%d'))
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{snapshot.expiry}_{now.strftime('%H%M%S')}.npy")
+        arrays = np.vstack([snapshot.strikes, *(snapshot.columns[name] for name in self.COLUMNS)])
+        partial = f'{path}.{os.getpid()}.tmp'
+        with open(partial, 'wb') as f:
+            np.save(f, arrays)
+        os.replace(partial, path)  # readers never see a half-written file
+        METRICS.inc('history_captures_total')
+        if time.monotonic() - self.last_compacted > HISTORY_COMPACT_EVERY:
+            self.compact(now)
+        return True
+
+    def load(self, path):
+        """(strikes, {column: array}) memory-mapped from one capture file"""
+        arrays = np.load(path, mmap_mode='r')
+        return arrays[0], {name: arrays[i + 1] for i, name in enumerate(self.COLUMNS)}
+
+    def before(self, ticker, expiry, when):
+        """(captured_at, path) of the latest capture at or before `when`, or None"""
+        earlier = [capture for capture in self.captures(ticker, expiry) if capture[0] <= when]
+        return earlier[-1] if earlier else None
+
+    def compact(self, now=None):
+        """Bound storage: last capture per expiry for past days, nothing beyond the retention window"""
+        self.last_compacted = time.monotonic()
+        now = (now or datetime.now(timezone.utc)).astimezone(MARKET_TZ)
+        today = now.strftime('%Y-%m-%d')
+        cutoff = (now - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        removed = 0
+        for ticker in os.listdir(self.root):
+            for day in self._days(ticker):
+                folder = os.path.join(self.root, ticker, day)
+                if day < cutoff:
+                    shutil.rmtree(folder, ignore_errors=True)
+                    continue
+                if day == today:
+                    continue
+                latest = {}
+                for name in sorted(os.listdir(folder)):
+                    if not name.endswith('.npy'):
+                        continue
+                    expiry = name.split('_', 1)[0]
+                    if expiry in latest:
+                        try:
+                            os.remove(os.path.join(folder, latest[expiry]))
+                            removed += 1
+                        except FileNotFoundError:
+                            pass  # another worker compacted it first
+                    latest[expiry] = name
+        logger.debug("History compaction removed %d captures", removed)
+        return removed
+
+
+# Function to open the history store, or None if it is disabled or the directory is unusable
+def open_history_store(path):
+    if not path:
+        return None
+    try:
+        return HistoryStore(path, HISTORY_INTERVAL, HISTORY_RETENTION_DAYS)
+    except OSError as e:
+        logger.warning("History store %s unavailable: %s", path, e)
+        return None
+
+
+HISTORY = open_history_store(HISTORY_DIR)
+HISTORY_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='history')
+
+# Function to give a forked worker its own history thread: one inherited from the gunicorn master
+# (started there by warm_up) does not exist in the child, so its jobs would queue forever
+def _reset_history_executor():
+    global HISTORY_EXECUTOR
+    HISTORY_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='history')
+
+
+os.register_at_fork(after_in_child=_reset_history_executor)
+
+# Function to append a freshly downloaded snapshot to the history store, off the request path
+def record_history(snapshot):
+    if HISTORY is None or snapshot.empty:
+        return
+
+    def record():
+        try:
+            HISTORY.record(snapshot)
+        except OSError as e:
+            logger.warning("Could not record history for %s %s: %s", snapshot.ticker, snapshot.expiry, e)
+
+    HISTORY_EXECUTOR.submit(record)
+
+# Function to parse a ?since= value (YYYY-MM-DD for the end of that day, or an ISO datetime);
+# the default is the end of the previous day, i.e. day-over-day changes
+def parse_since(value, now=None):
+    now = (now or datetime.now(timezone.utc)).astimezone(MARKET_TZ)
+    if not value:
+        return now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(microseconds=1)
+    if len(value) == 10:
+        return datetime.strptime(value, '%Y-%m-%d').replace(hour=23, minute=59, second=59, tzinfo=MARKET_TZ)
+    when = datetime.fromisoformat(value)
+    return when if when.tzinfo else when.replace(tzinfo=MARKET_TZ)
+
+# Function to compute OI and volume changes per strike of `chain` against a stored capture.
+# A strike missing from the capture counts as 0 before; NaN only where both sides are missing.
+def chain_changes(chain, prior_strikes, prior_columns):
+    if len(prior_strikes):
+        positions = np.minimum(np.searchsorted(prior_strikes, chain.strikes), len(prior_strikes) - 1)
+        matched = prior_strikes[positions] == chain.strikes
+    changes = {}
+    for name in ('call_volume', 'put_volume', 'call_oi', 'put_oi'):
+        current = chain.columns[name]
+        before = np.full(len(chain), np.nan)
+        if len(prior_strikes):
+            before[matched] = prior_columns[name][positions[matched]]
+        change = np.nan_to_num(current) - np.nan_to_num(before)
+        change[np.isnan(current) & np.isnan(before)] = np.nan
+        changes[f'{name}_change'] = change
+    return changes
+
+# Function to find the capture to compare against and compute changes; (captured_at, changes) or None
+def history_changes(chain, since=None):
+    if HISTORY is None:
+        return None
+    capture = HISTORY.before(chain.ticker, chain.expiry, parse_since(since))
+    if capture is None:
+        return None
+    captured_at, path = capture
+    prior_strikes, prior_columns = HISTORY.load(path)
+    return captured_at, chain_changes(chain, prior_strikes, prior_columns)
+
+
+# Function to empty every cache, including the shared store
+def clear_caches():
+    for cache in (CHAIN_CACHE, EXPIRY_CACHE, PRICE_CACHE, IMAGE_CACHE, API_CACHE):
+        cache.clear()
+    if shared_namespace(CHAIN_CACHE) is not None:
+        SHARED_STORE.clear()
+
+
+# Function to import the plotting stack with the non-interactive backend selected
+def load_plotting():
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    return Figure, sns
+
+# Function to warm up a render worker: plotting stack imported and font cache loaded before the first job.
+# The worker reports its pid so a hung render can be terminated without reaching into the pool's internals.
+def _render_worker_init(pids):
+    pids.put(os.getpid())
+    Figure, _ = load_plotting()
+    fig = Figure(figsize=(1, 1))
+    fig.subplots().set_title('warm-up')
+    fig.savefig(io.BytesIO(), format='png')
+
+
+class RenderService:
+    """Runs chart render functions on a process pool and returns their image bytes.
+
+    At most `max_pending` renders are queued or running at once; when the pool is full or a
+    render exceeds `timeout` seconds, `render` returns None and the caller serves a placeholder.
+    """
+
+    def __init__(self, workers, max_pending, timeout):
+        self.workers = workers
+        self.timeout = timeout
+        self.pending = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._worker_pids = {}  # pool -> queue its workers report their pids on
+
+    def _get_pool(self):
+        # Created lazily and per process, so gunicorn workers never share a pool forked from the master
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                context = multiprocessing.get_context('spawn')
+                pids = context.Queue()
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_render_worker_init,
+                    initargs=(pids,),
+                )
+                self._pool_pid = os.getpid()
+                self._worker_pids = {self._pool: pids}
+            return self._pool
+
+    def _reset_pool(self, pool, terminate=False):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+            pids = self._worker_pids.pop(pool, None)
+        worker_pids = []
+        while terminate and pids is not None:
+            try:
+                worker_pids.append(pids.get_nowait())
+            except queue.Empty:
+                break
+        pool.shutdown(wait=False, cancel_futures=True)
+        # A running render can't be cancelled, so its worker has to be terminated. The pool cannot
+        # tell which worker is stuck and treats any worker dying as broken, failing every render
+        # still in flight (which releases their queue slots); the whole pool is recycled either way.
+        for pid in worker_pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def render(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+        if not self._slots.acquire(blocking=False):
+            METRICS.inc('render_rejected_total')
+            logger.warning("Render queue full, skipping %s", func.__name__)
+            return None
+        with self._lock:
+            self.pending += 1
+        pool = None
+        try:
+            pool = self._get_pool()
+            future = pool.submit(func, *args)
+        except Exception as e:
+            self._release()
+            logger.warning("Render pool unavailable: %s", e)
+            if pool is not None:
+                self._reset_pool(pool)
+            return None
+        # The slot is held until the worker actually finishes or is terminated
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            METRICS.inc('render_timeouts_total')
+            logger.warning("%s timed out after %ss, recycling the render pool", func.__name__, self.timeout)
+            if not future.cancel():
+                self._reset_pool(pool, terminate=True)
+        except BrokenProcessPool as e:
+            logger.warning("Render pool crashed: %s", e)
+            self._reset_pool(pool)
+        return None
+
+
+RENDER_SERVICE = RenderService(RENDER_WORKERS, RENDER_QUEUE_SIZE, RENDER_TIMEOUT)
+
+
+# Function to build a plain grey PNG, served when a chart can't be rendered in time
+def placeholder_png(width=800, height=400, shade=0xE6):
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+    scanline = b'\x00' + bytes([shade]) * width  # filter type 0, 8-bit greyscale pixels
+    header = struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(scanline * height, 9)) + chunk(b'IEND', b''))
+
+
+PLACEHOLDER_PNG = placeholder_png()
+
+# HTML Template for Dashboard, in three parts streamed as their data becomes available:
+# the page head and title at once, then price and form once expiries are known, then results
+TEMPLATE_HEAD = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -35,6 +1112,12 @@ TEMPLATE = """
         .error { color: red; background-color: #ffe6e6; padding: 10px; border-radius: 4px; margin: 10px 0; }
         .info { color: #0066cc; background-color: #e6f3ff; padding: 10px; border-radius: 4px; margin: 10px 0; }
         .current-price { font-size: 18px; font-weight: bold; color: #28a745; text-align: center; margin: 10px 0; }
+        .data-age { font-size: 13px; color: #856404; background-color: #fff3cd; text-align: center; padding: 6px; border-radius: 4px; margin: 10px 0; }
+        .live-controls { text-align: right; margin-top: 15px; font-size: 14px; }
+        .live-controls label { width: auto; }
+        #live-status { color: #666; margin-left: 8px; }
+        #live-chart { display: none; width: 100%; height: 240px; margin-top: 10px; border: 1px solid #eee; }
+        tr.live-changed td { background-color: #fff3cd; }
         .heatmap-outer { width: 100vw; margin-left: calc(-1 * ((100vw - 100%) / 2)); background: white; padding: 0; }
         .heatmap-inner { width: 98vw; max-width: 2000px; margin: 0 auto; text-align: center; }
         .gex-chart-container { text-align: center; margin-top: 30px; }
@@ -65,9 +1148,13 @@ TEMPLATE = """
 <body>
     <div class="container">
         <h2>Options Chain Dashboard for {{ ticker.upper() }}</h2>
-        
-        {% if current_price %}
-        <div class="current-price">Current Price: ${{ current_price }}</div>
+"""
+
+TEMPLATE_FORM = """
+        {% if current_price is not none %}
+        <div class="current-price">Current Price: ${{ '%.2f' % current_price }}</div>
+        {% elif available_expiries %}
+        <div class="current-price">Current Price: unavailable</div>
         {% endif %}
         
         <form method="get">
@@ -96,8 +1183,27 @@ TEMPLATE = """
                 <input type="text" id="range" name="range" value="{{ strike_range }}" required placeholder="e.g., 150-200">
             </div>
             
+            <div class="form-group">
+                <label for="agg_expiries">Aggregate:</label>
+                <select id="agg_expiries" name="agg_expiries">
+                    {% for count, label in [(3, 'Next 3 expiries'), (6, 'Next 6 expiries'), (12, 'Next 12 expiries'), (0, 'All expiries')] %}
+                        <option value="{{ count }}" {% if count == agg_expiries %}selected{% endif %}>{{ label }}</option>
+                    {% endfor %}
+                </select>
+                <select id="agg_weight" name="agg_weight">
+                    <option value="none" {% if agg_weight == 'none' %}selected{% endif %}>Unweighted</option>
+                    <option value="time" {% if agg_weight == 'time' %}selected{% endif %}>Weight near-term expiries</option>
+                </select>
+            </div>
+            
             <button type="submit">Get Options Data</button>
         </form>
+"""
+
+TEMPLATE_RESULTS = """
+        {% if data_stale %}
+        <div class="data-age">Live data is temporarily unavailable &mdash; showing data from {{ data_age // 60 }} min {{ data_age % 60 }} s ago.</div>
+        {% endif %}
         
         {% if error %}
         <div class="error">{{ error }}</div>
@@ -108,81 +1214,414 @@ TEMPLATE = """
         {% endif %}
         
         {% if table %}
+        <div class="live-controls">
+            <label><input type="checkbox" id="live-toggle" data-url="/live/{{ ticker }}/{{ expiry }}?range={{ strike_range }}"> Live updates</label>
+            <span id="live-status"></span>
+        </div>
+        <canvas id="live-chart" width="1100" height="240"></canvas>
         <div style="overflow-x: auto;">
             {{ table|safe }}
         </div>
+        <script>
+        // Live mode: follow /live over Server-Sent Events and patch the changed rows in place
+        (function () {
+            var toggle = document.getElementById('live-toggle');
+            var status = document.getElementById('live-status');
+            var canvas = document.getElementById('live-chart');
+            var table = document.querySelector('table.table');
+            var headers = Array.prototype.map.call(table.tHead.rows[0].cells, function (th) { return th.textContent.trim(); });
+            var rows = {};
+            Array.prototype.forEach.call(table.tBodies[0].rows, function (tr) { rows[tr.cells[0].textContent.trim()] = tr; });
+            var volumes = {};  // strike -> [call volume, put volume], for the chart
+            var source = null;
+
+            function format(value) {
+                return value === null || isNaN(value) ? '-' : (Math.round(value * 10) / 10).toFixed(1);
+            }
+            function setCell(tr, name, value) {
+                var i = headers.indexOf(name);
+                if (i >= 0) { tr.cells[i].textContent = format(value); }
+            }
+            function share(a, b) {
+                return a === null || b === null || a + b === 0 ? null : a / (a + b) * 100;
+            }
+            function apply(update) {
+                update.strike.forEach(function (strike, i) {
+                    var cv = update.call_volume[i], pv = update.put_volume[i], co = update.call_oi[i], po = update.put_oi[i];
+                    volumes[strike] = [cv || 0, pv || 0];
+                    var tr = rows[update.label[i].toFixed(1)];
+                    if (!tr) { return; }
+                    var vol = share(cv, pv), oi = share(co, po);
+                    setCell(tr, 'Call Vol', cv); setCell(tr, 'Put Vol', pv);
+                    setCell(tr, 'Call Vol %', vol); setCell(tr, 'Put Vol %', vol === null ? null : 100 - vol);
+                    setCell(tr, 'Call OI', co); setCell(tr, 'Put OI', po);
+                    setCell(tr, 'Call OI %', oi); setCell(tr, 'Put OI %', oi === null ? null : 100 - oi);
+                    tr.classList.add('live-changed');
+                    setTimeout(function () { tr.classList.remove('live-changed'); }, 1500);
+                });
+                draw();
+                status.textContent = 'updated ' + new Date(update.fetched_at * 1000).toLocaleTimeString();
+            }
+            function draw() {
+                // Call volume above the axis, put volume below, one bar per strike
+                var strikes = Object.keys(volumes).map(Number).sort(function (a, b) { return a - b; });
+                var ctx = canvas.getContext('2d'), w = canvas.width, h = canvas.height, mid = h / 2;
+                var top = 1;
+                strikes.forEach(function (s) { top = Math.max(top, volumes[s][0], volumes[s][1]); });
+                var step = w / Math.max(strikes.length, 1), scale = (mid - 14) / top;
+                ctx.clearRect(0, 0, w, h);
+                strikes.forEach(function (s, i) {
+                    ctx.fillStyle = '#28a745';
+                    ctx.fillRect(i * step, mid - volumes[s][0] * scale, Math.max(step - 1, 1), volumes[s][0] * scale);
+                    ctx.fillStyle = '#dc3545';
+                    ctx.fillRect(i * step, mid, Math.max(step - 1, 1), volumes[s][1] * scale);
+                });
+                ctx.fillStyle = '#333';
+                ctx.fillText('Call volume', 4, 12);
+                ctx.fillText('Put volume', 4, h - 4);
+                if (strikes.length) {
+                    ctx.textAlign = 'right';
+                    ctx.fillText(strikes[0] + ' - ' + strikes[strikes.length - 1], w - 4, 12);
+                    ctx.textAlign = 'left';
+                }
+            }
+            function start() {
+                source = new EventSource(toggle.dataset.url);
+                canvas.style.display = 'block';
+                status.textContent = 'connecting...';
+                ['snapshot', 'delta'].forEach(function (kind) {
+                    source.addEventListener(kind, function (e) { apply(JSON.parse(e.data)); });
+                });
+                source.addEventListener('reset', function () {
+                    // The strike list changed: reload the page with live mode still on
+                    var url = new URL(location.href);
+                    url.searchParams.set('live', '1');
+                    location.href = url;
+                });
+                source.onerror = function () {
+                    status.textContent = source.readyState === EventSource.CLOSED ? 'unavailable, refresh the page instead' : 'reconnecting...';
+                };
+            }
+            toggle.addEventListener('change', function () {
+                if (toggle.checked) {
+                    start();
+                } else {
+                    source.close();
+                    canvas.style.display = 'none';
+                    status.textContent = '';
+                }
+            });
+            if (new URLSearchParams(location.search).get('live') === '1') {
+                toggle.checked = true;
+                start();
+            }
+        })();
+        </script>
         {% endif %}
         
-        {% if heatmap_img %}
+        {% if table %}
         <div class="heatmap-outer">
             <div class="heatmap-inner">
                 <h3 style="margin-top:30px;">Strike Volume Heatmap</h3>
-                <img src="data:image/png;base64,{{ heatmap_img }}" style="width:98vw;max-width:2000px;height:auto;border:1px solid #ccc;display:block;margin:0 auto;"/>
+                <img src="/heatmap/{{ ticker }}/{{ expiry }}?range={{ strike_range }}" alt="Strike Volume Heatmap" style="width:98vw;max-width:2000px;height:auto;border:1px solid #ccc;display:block;margin:0 auto;"/>
             </div>
         </div>
         {% endif %}
         
         {% if table %}
         <div class="gex-chart-container">
-            <h3>Options Activity (GEX-style) by Strike</h3>
+            <h3>Gamma Exposure (GEX) by Strike</h3>
             <a href="/gex_chart/{{ ticker }}/{{ expiry }}?range={{ strike_range }}" target="_blank">
                 <img src="/gex_chart/{{ ticker }}/{{ expiry }}?range={{ strike_range }}" alt="GEX Chart - Click to open in new tab"/>
             </a>
         </div>
+        
+        <div class="gex-chart-container">
+            <h3>Aggregate Gamma Exposure ({% if agg_expiries %}next {{ agg_expiries }}{% else %}all{% endif %} expiries)</h3>
+            <a href="/aggregate_chart/{{ ticker }}?range={{ strike_range }}&expiries={{ agg_expiries }}&weight={{ agg_weight }}" target="_blank">
+                <img src="/aggregate_chart/{{ ticker }}?range={{ strike_range }}&expiries={{ agg_expiries }}&weight={{ agg_weight }}" alt="Aggregate GEX Chart - Click to open in new tab"/>
+            </a>
+        </div>
         {% endif %}
     </div>
 </body>
 </html>
 """
 
+PAGE_HEAD, PAGE_FORM, PAGE_RESULTS = (app.jinja_env.from_string(source)
+                                      for source in (TEMPLATE_HEAD, TEMPLATE_FORM, TEMPLATE_RESULTS))
+
+class DataProvider(ABC):
+    """Upstream source of expiries, option chains and spot prices.
+
+    All market data used by the app is fetched through the active provider (see `set_provider`),
+    so it can be replaced, e.g. by the recorded-fixture provider used in `benchmarks/`.
+    """
+
+    @abstractmethod
+    def get_expiries(self, ticker):
+        """Expiry dates ('YYYY-MM-DD') listed for the ticker"""
+
+    @abstractmethod
+    def get_option_chain(self, ticker, expiry):
+        """(calls, puts) DataFrames with yfinance option chain columns"""
+
+    @abstractmethod
+    def get_spot_price(self, ticker):
+        """Latest underlying price, or None if unknown"""
+
+    def get_spot_prices(self, tickers):
+        """{ticker: latest price or None} for several tickers; providers that can should batch this"""
+        prices = {}
+        for ticker in tickers:
+            try:
+                prices[ticker] = self.get_spot_price(ticker)
+            except (KeyError, ValueError):
+                prices[ticker] = None  # unknown ticker: no price, not an upstream failure
+        return prices
+
+
+class YahooProvider(DataProvider):
+    """Yahoo Finance via yfinance"""
+
+    def __init__(self):
+        # One yf.Ticker per symbol, so its expiry -> timestamp map is downloaded once, not per chain
+        self._tickers = {}
+        self._lock = threading.Lock()
+        self._download_lock = threading.Lock()  # yf.download keeps its results in module globals
+
+    def _ticker(self, ticker, refresh=False):
+        ticker = ticker.upper()
+        with self._lock:
+            tk = self._tickers.get(ticker)
+            if tk is None or refresh:
+                import yfinance as yf
+                tk = self._tickers[ticker] = yf.Ticker(ticker)
+            return tk
+
+    def get_expiries(self, ticker):
+        # Fresh Ticker each time, so newly listed expiries are picked up by later chain requests
+        return tuple(self._ticker(ticker, refresh=True).options)
+
+    def get_option_chain(self, ticker, expiry):
+        opt_chain = self._ticker(ticker).option_chain(expiry)
+        return opt_chain.calls, opt_chain.puts
+
+    def get_spot_price(self, ticker):
+        return self.get_spot_prices([ticker])[ticker.upper()]
+
+    def get_spot_prices(self, tickers):
+        # Latest one-minute bar close: the chart endpoint returns a few KB per symbol, where
+        # Ticker.info downloads the whole quote summary just for regularMarketPrice.
+        # yf.download still sends one chart request per symbol (on its own threads) and only
+        # prints failures, keeping them in yf.shared._ERRORS, so those are checked here.
+        import yfinance as yf
+        tickers = [ticker.upper() for ticker in tickers]
+        with self._download_lock:
+            bars = yf.download(tickers, period='1d', interval='1m', group_by='ticker', auto_adjust=False,
+                               threads=True, progress=False, show_errors=False)
+            errors = dict(yf.shared._ERRORS)
+        if tickers and all(ticker in errors for ticker in tickers):
+            # Every symbol failing is an outage unless Yahoo simply has no such symbols
+            if not all('delisted' in str(errors[ticker]) for ticker in tickers):
+                raise ConnectionError(f"Quote download failed: {errors[tickers[0]]}")
+        prices = {}
+        for ticker in tickers:
+            try:
+                closes = bars[ticker]['Close'] if len(tickers) > 1 else bars['Close']
+                closes = closes.dropna()
+                prices[ticker] = float(closes.iloc[-1]) if len(closes) else None
+            except KeyError:
+                prices[ticker] = None
+        return prices
+
+
+PROVIDER = YahooProvider()
+
+
+# Function to swap the upstream data provider (benchmarks, offline development)
+def set_provider(provider):
+    global PROVIDER
+    PROVIDER = provider
+    clear_caches()
+
+
+# Concurrent spot price and chain lookups for dashboard pages
+PAGE_EXECUTOR = ThreadPoolExecutor(max_workers=PAGE_FETCH_WORKERS, thread_name_prefix='page')
+
+# Background refreshes of stale entries, one in flight per cache key
+REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='refresh')
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+# Function to give a forked worker its own refresh threads; refreshes queued in the master
+# would never run in the child and their keys would stay marked as in flight
+def _reset_refresh_executor():
+    global REFRESH_EXECUTOR, _refreshing_lock
+    REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='refresh')
+    _refreshing.clear()
+    _refreshing_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_refresh_executor)
+
+# Function to fetch a missing or expired entry into `cache`, through the shared store when the
+# cache is backed by one so a key is downloaded once per host rather than once per worker
+def load_entry(cache, key, fetch, keep=lambda value: True, max_age=None):
+    shared = shared_namespace(cache)
+    if shared is not None:
+        try:
+            return shared.load(cache, key, fetch, keep, cache.ttl if max_age is None else max_age)
+        except sqlite3.Error as e:
+            logger.warning("Shared store error, fetching directly: %s", e)
+    value = fetch()
+    if keep(value):
+        cache.set(key, value)
+    return value
+
+# Function to put a freshly fetched value in `cache` and, when it is backed by one, the shared store
+def store_entry(cache, key, value):
+    cache.set(key, value)
+    shared = shared_namespace(cache)
+    if shared is not None:
+        try:
+            shared.put(cache, key, value)
+        except sqlite3.Error as e:
+            logger.warning("Shared store error: %s", e)
+
+# Function to refresh one cache entry in the background; failures keep the stale value.
+# A fetch whose value `keep` rejects (e.g. an empty expiry list during an outage) stored
+# nothing, so it is counted as 'rejected' rather than 'ok'.
+def _refresh_entry(cache, key, fetch, keep):
+    try:
+        value = load_entry(cache, key, fetch, keep)
+        METRICS.inc('background_refresh_total', outcome='ok' if keep(value) else 'rejected')
+    except Exception as e:
+        METRICS.inc('background_refresh_total', outcome='error')
+        logger.debug("Background refresh of %s failed: %s", key, e)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard((id(cache), key))
+
+# Function to read through a cache with stale-while-revalidate.
+# A fresh hit is returned as is; a stale hit is returned immediately while a refresh runs in the
+# background; only a miss waits for the upstream. `keep` decides which fetched values are cached.
+def cached_fetch(cache, key, fetch, keep=lambda value: True):
+    found = cache.lookup(key)
+    shared = shared_namespace(cache)
+    if shared is not None and (found is None or not found[2]):
+        # Another worker may already hold a fresher copy
+        try:
+            found = shared.lookup(cache, key, older_than=found[1] if found else None) or found
+        except sqlite3.Error as e:
+            logger.warning("Shared store error: %s", e)
+    stats = _request_stats.get()
+    if found is not None:
+        value, age, fresh = found
+        if stats is not None:
+            stats.note_data(age, fresh)
+        if not fresh:
+            with _refreshing_lock:
+                start = (id(cache), key) not in _refreshing
+                _refreshing.add((id(cache), key))
+            if start:
+                REFRESH_EXECUTOR.submit(_refresh_entry, cache, key, fetch, keep)
+        return value
+    return load_entry(cache, key, fetch, keep)
+
+# Function to download one expiry's chain and build its snapshot
+def load_chain_snapshot(ticker, expiry):
+    calls, puts = upstream_call('option_chain', PROVIDER.get_option_chain, ticker, expiry)
+    with span('merge'):
+        snapshot = ChainSnapshot.from_frames(ticker, expiry, calls, puts)
+    record_history(snapshot)
+    return snapshot
+
+# Function to get the ChainSnapshot for one expiry, served from CHAIN_CACHE (possibly stale)
+def get_chain_snapshot(ticker, expiry):
+    return cached_fetch(CHAIN_CACHE, (ticker.upper(), expiry),
+                        lambda: load_chain_snapshot(ticker, expiry))
+
+# Function to check a single expiry; the downloaded chain stays in CHAIN_CACHE for the page that follows
+def expiry_has_options(ticker, date):
+    try:
+        logger.debug("Checking expiry: %s", date)
+        snapshot = get_chain_snapshot(ticker, date)
+        calls_valid = snapshot.has_calls
+        puts_valid = snapshot.has_puts
+        logger.debug("Calls valid: %s, Puts valid: %s", calls_valid, puts_valid)
+        return calls_valid or puts_valid
+    except Exception as e:
+        logger.debug("Expiry %s for %s is invalid: %s", date, ticker, e)
+        return False
+
 # Function to get available expiry dates for a ticker
 # Only return dates that actually have valid options data
 
 def get_available_expiries(ticker):
-    import datetime
     try:
-        print(f"[DEBUG] Fetching available expiries for ticker: {ticker}")
-        tk = yf.Ticker(ticker)
-        expiries = None
-        try:
-            expiries = tk.options
-            print(f"[DEBUG] yfinance returned expiries: {expiries}")
-        except Exception as e:
-            print(f"[DEBUG] Method 1 failed for {ticker}: {e}")
-        if not expiries:
-            import time
-            time.sleep(1)
-            try:
-                expiries = tk.options
-                print(f"[DEBUG] Retry: yfinance returned expiries: {expiries}")
-            except Exception as e:
-                print(f"[DEBUG] Method 2 failed for {ticker}: {e}")
-        if not expiries:
-            expiries = get_fallback_expiries(ticker)
-            print(f"[DEBUG] Using fallback expiries: {expiries}")
-        valid_expiries = []
-        for date in expiries:
-            try:
-                print(f"[DEBUG] Checking expiry: {date}")
-                opt_chain = tk.option_chain(date)
-                calls_valid = hasattr(opt_chain, 'calls') and not opt_chain.calls.empty
-                puts_valid = hasattr(opt_chain, 'puts') and not opt_chain.puts.empty
-                print(f"[DEBUG] Calls valid: {calls_valid}, Puts valid: {puts_valid}")
-                if calls_valid or puts_valid:
-                    valid_expiries.append(date)
-                    print(f"[DEBUG] Valid expiry found: {date}")
-                else:
-                    print(f"[DEBUG] No valid options data for expiry: {date}")
-            except Exception as e:
-                print(f"[DEBUG] Expiry {date} for {ticker} is invalid: {e}")
-                continue
-        valid_expiries = sorted(valid_expiries)
-        print(f"[DEBUG] Final valid expiries for {ticker}: {valid_expiries}")
-        return valid_expiries[:12]
+        return list(cached_fetch(EXPIRY_CACHE, ticker.upper(),
+                                 lambda: tuple(discover_expiries(ticker)), keep=bool))
     except Exception as e:
-        print(f"[DEBUG] Error getting expiries for {ticker}: {e}")
+        logger.warning("Error getting expiries for %s: %s", ticker, e)
         return []
 
+# Function to list every expiry the upstream offers for a ticker from today on, unvalidated and
+# not capped at MAX_EXPIRIES like the selector's list; for all-expiry aggregates and max pain
+def get_listed_expiries(ticker):
+    ticker = ticker.upper()
+    today = datetime.now(MARKET_TZ).strftime('%Y-%m-%d')
+    try:
+        listed = cached_fetch(EXPIRY_CACHE, (ticker, 'listed'),
+                              lambda: tuple(sorted(upstream_call('options', PROVIDER.get_expiries, ticker))),
+                              keep=bool)
+    except Exception as e:
+        logger.warning("Error listing expiries for %s: %s", ticker, e)
+        listed = get_available_expiries(ticker)
+    return [expiry for expiry in listed if expiry >= today]
+
+# Function to list and validate a ticker's expiries against the upstream.
+# No retry here: while Yahoo is failing the circuit breaker fails fast and the
+# fallback dates are validated instead (which also fail fast until it recovers).
+def discover_expiries(ticker):
+    logger.debug("Fetching available expiries for ticker: %s", ticker)
+    expiries = None
+    try:
+        expiries = upstream_call('options', PROVIDER.get_expiries, ticker)
+        logger.debug("yfinance returned expiries: %s", expiries)
+    except Exception as e:
+        logger.warning("Listing expiries failed for %s: %s", ticker, e)
+    if not expiries:
+        expiries = get_fallback_expiries(ticker)
+        logger.debug("Using fallback expiries: %s", expiries)
+
+    # Validate in date order on a bounded pool, never keeping more checks in flight
+    # than are still needed, and stop once MAX_EXPIRIES valid dates are confirmed
+    candidates = iter(sorted(set(expiries)))
+    valid_expiries = []
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=EXPIRY_VALIDATION_WORKERS) as pool:
+        while True:
+            wanted = min(EXPIRY_VALIDATION_WORKERS, MAX_EXPIRIES - len(valid_expiries))
+            while len(pending) < wanted:
+                date = next(candidates, None)
+                if date is None:
+                    break
+                pending.append((date, submit_with_context(pool, expiry_has_options, ticker, date)))
+            if not pending or len(valid_expiries) >= MAX_EXPIRIES:
+                break
+            date, future = pending.popleft()
+            if future.result():
+                valid_expiries.append(date)
+                logger.debug("Valid expiry found: %s", date)
+            else:
+                logger.debug("No valid options data for expiry: %s", date)
+        for _, future in pending:
+            future.cancel()
+
+    logger.debug("Final valid expiries for %s: %s", ticker, valid_expiries)
+    return valid_expiries
+
 def get_fallback_expiries(ticker):
     """Provide fallback expiry dates when yfinance fails"""
     import datetime
@@ -217,115 +1656,822 @@ def get_fallback_expiries(ticker):
     
     return fallback_dates
 
-# Function to get current stock price
+class QuoteService:
+    """Spot prices fetched in batches: one provider call covers many tickers.
+
+    `get_many` splits a list of tickers into calls of at most `batch_size`. `get` serves a single
+    ticker but waits `batch_window` seconds for concurrent requests for other tickers, so
+    simultaneous page loads share one provider call. The upstream still serves one symbol per
+    request, so a batch is counted and rate-limited as one upstream call per ticker. Prices are rounded to cents; a ticker the
+    upstream has no price for maps to None, which is distinct from a price of 0.
+    """
+
+    def __init__(self, batch_window, batch_size):
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self._pending = {}  # ticker -> Future resolved by the next batch
+        self._lock = threading.Lock()
+
+    def get_many(self, tickers):
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        prices = {}
+        for start in range(0, len(tickers), self.batch_size):
+            batch = tickers[start:start + self.batch_size]
+            quotes = upstream_call('quotes', PROVIDER.get_spot_prices, batch, units=len(batch))
+            for ticker in batch:
+                price = quotes.get(ticker)
+                prices[ticker] = round(float(price), 2) if price is not None and np.isfinite(price) else None
+        return prices
+
+    def get(self, ticker):
+        ticker = ticker.upper()
+        with self._lock:
+            future = self._pending.get(ticker)
+            leader = not self._pending
+            if future is None:
+                future = self._pending[ticker] = Future()
+        if leader:
+            # First caller gathers whatever else arrives within the window and fetches for all
+            if self.batch_window > 0:
+                time.sleep(self.batch_window)
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            try:
+                prices = self.get_many(list(batch))
+            except Exception as e:
+                for waiting in batch.values():
+                    waiting.set_exception(e)
+            else:
+                for name, waiting in batch.items():
+                    waiting.set_result(prices.get(name))
+        return future.result()
+
+
+QUOTES = QuoteService(QUOTE_BATCH_WINDOW, QUOTE_BATCH_SIZE)
+
+
+# Function to get current stock price, served from PRICE_CACHE (possibly stale).
+# Returns None when no price is available; a missing price is not cached.
 def get_current_price(ticker):
     try:
-        tk = yf.Ticker(ticker)
-        info = tk.info
-        return round(info.get('regularMarketPrice', 0), 2)
-    except:
+        return cached_fetch(PRICE_CACHE, ticker.upper(), lambda: QUOTES.get(ticker),
+                            keep=lambda price: price is not None)
+    except Exception as e:
+        logger.warning("Spot price for %s unavailable: %s", ticker, e)
+        return None
+
+# Function to check a spot price can anchor exposure calculations; (message, status) if not
+def spot_price_problem(price):
+    if price is None:
+        return "Spot price unavailable", 503
+    if price <= 0:
+        return f"Spot price is {price}; gamma exposure needs a positive price", 422
+    return None
+
+# Function to check whether the US equity options market is open (regular session, holidays ignored)
+def market_is_open(now=None):
+    now = (now or datetime.now(timezone.utc)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and (9, 30) <= (now.hour, now.minute) < (16, 0)
+
+
+class Prefetcher:
+    """Keeps expiry lists, spot prices and the nearest chains of a watchlist warm in the caches.
+
+    The watchlist is the configured tickers plus the `hot_count` most requested ones; request
+    counts halve every pass so the hot list follows recent traffic. Each pass spaces its tickers
+    evenly over the interval to stay gentle on the upstream and only refreshes entries that would
+    expire before the next pass. Outside market hours only missing entries are fetched.
+    """
+
+    MAX_TRACKED = 200  # distinct tickers remembered between passes
+
+    def __init__(self, interval, tickers, hot_count, chains, market_hours_only=True):
+        self.interval = interval
+        self.tickers = list(tickers)
+        self.hot_count = hot_count
+        self.chains = chains
+        self.market_hours_only = market_hours_only
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def note_request(self, ticker):
+        with self._lock:
+            self.requests[ticker] += 1
+
+    def watchlist(self):
+        with self._lock:
+            hot = [ticker for ticker, _ in self.requests.most_common(self.hot_count)]
+        return list(dict.fromkeys(self.tickers + hot))
+
+    def _decay(self):
+        with self._lock:
+            kept = self.requests.most_common(self.MAX_TRACKED)
+            self.requests = Counter({ticker: count / 2 for ticker, count in kept if count >= 0.5})
+
+    def _max_age(self, cache):
+        # Oldest entry that still outlives the next pass
+        return max(cache.ttl - self.interval, 0)
+
+    def _due(self, cache, key, refresh_all):
+        found = cache.peek(key)
+        if found is None:
+            return True
+        return refresh_all and found[1] > self._max_age(cache)
+
+    def refresh(self, ticker, refresh_all=True):
+        """Refresh one ticker's expiry list, spot price and nearest chains where due"""
+        if self._due(EXPIRY_CACHE, ticker, refresh_all):
+            load_entry(EXPIRY_CACHE, ticker, lambda: tuple(discover_expiries(ticker)), keep=bool,
+                       max_age=self._max_age(EXPIRY_CACHE))
+            METRICS.inc('prefetch_refresh_total', kind='expiries')
+        found = EXPIRY_CACHE.peek(ticker)
+        for expiry in (found[0] if found else ())[:self.chains]:
+            if self._due(CHAIN_CACHE, (ticker, expiry), refresh_all):
+                load_entry(CHAIN_CACHE, (ticker, expiry), lambda: load_chain_snapshot(ticker, expiry),
+                           max_age=self._max_age(CHAIN_CACHE))
+                METRICS.inc('prefetch_refresh_total', kind='chain')
+
+    def refresh_prices(self, tickers, refresh_all=True):
+        """Refresh every due spot price in the watchlist with one batched quote call"""
+        due = [ticker for ticker in tickers if self._due(PRICE_CACHE, ticker, refresh_all)]
+        shared = shared_namespace(PRICE_CACHE)
+        if shared is not None:
+            # Another worker's pass may have just fetched them
+            max_age = self._max_age(PRICE_CACHE)
+            due = [ticker for ticker in due
+                   if (shared.lookup(PRICE_CACHE, ticker, older_than=max_age + 1e-9) is None)]
+        if not due:
+            return
+        for ticker, price in QUOTES.get_many(due).items():
+            if price is not None:
+                store_entry(PRICE_CACHE, ticker, price)
+        METRICS.inc('prefetch_refresh_total', kind='price', amount=len(due))
+
+    def run_pass(self):
+        refresh_all = market_is_open() or not self.market_hours_only
+        tickers = self.watchlist()
+        self._decay()
+        try:
+            self.refresh_prices(tickers, refresh_all)
+        except Exception as e:
+            logger.debug("Prefetch of spot prices failed: %s", e)
+        spacing = self.interval / max(len(tickers), 1)
+        for ticker in tickers:
+            started = time.monotonic()
+            try:
+                with span('prefetch'):
+                    self.refresh(ticker, refresh_all)
+            except Exception as e:
+                logger.debug("Prefetch of %s failed: %s", ticker, e)
+            if self._stop.wait(max(spacing - (time.monotonic() - started), 0)):
+                return
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.run_pass()
+            self._stop.wait(max(self.interval - (time.monotonic() - started), 0))
+
+    def ensure_started(self):
+        """Start the scheduler thread in this process (gunicorn workers don't inherit threads)"""
+        if self._thread is not None or self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='prefetch', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+PREFETCHER = Prefetcher(PREFETCH_INTERVAL, PREFETCH_TICKERS, PREFETCH_HOT_COUNT, PREFETCH_CHAINS,
+                        PREFETCH_MARKET_HOURS_ONLY)
+
+# Function to find the rows whose LIVE_COLUMNS changed between two snapshots of one expiry
+# (NaN equals NaN); None when the strike lists differ so rows cannot be matched up
+def changed_rows(previous, current):
+    if not np.array_equal(previous.strikes, current.strikes):
         return None
+    changed = np.zeros(len(current), dtype=bool)
+    for name in LIVE_COLUMNS:
+        before, after = previous.columns[name], current.columns[name]
+        changed |= (before != after) & ~(np.isnan(before) & np.isnan(after))
+    return np.flatnonzero(changed)
+
+
+class LiveFeed:
+    """Polls one expiry's chain every `hub.interval` seconds for as long as it has subscribers.
+
+    Each subscriber is a queue of (kind, snapshot, rows) updates: 'snapshot' (all rows) when it
+    joins, 'delta' with the indices of the rows that changed since the previous poll, and 'reset'
+    when the strike list itself changed. Polls go through load_entry, so the chain cache, the
+    shared store and the dashboard all reuse the download.
+    """
+
+    def __init__(self, hub, ticker, expiry):
+        self.hub = hub
+        self.ticker = ticker
+        self.expiry = expiry
+        self.snapshot = None
+        self.subscribers = set()
+        self.thread = threading.Thread(target=self._run, name=f'live-{ticker}-{expiry}', daemon=True)
+
+    def poll(self):
+        key = (self.ticker, self.expiry)
+        found = CHAIN_CACHE.peek(key)
+        if found is not None and found[1] < self.hub.interval:
+            return found[0]  # fetched since the last poll, e.g. by a page view or the prefetcher
+        return load_entry(CHAIN_CACHE, key, lambda: load_chain_snapshot(self.ticker, self.expiry),
+                          max_age=self.hub.interval)
+
+    def publish(self, update):
+        for updates in self.subscribers:
+            try:
+                updates.put_nowait(update)
+            except queue.Full:
+                # Slow client: drop its backlog and resync it from the latest snapshot
+                with updates.mutex:
+                    updates.queue.clear()
+                updates.put_nowait(('snapshot', update[1], None))
+
+    def _update(self, snapshot):
+        if self.snapshot is None:
+            return ('snapshot', snapshot, None)
+        rows = changed_rows(self.snapshot, snapshot)
+        if rows is None:
+            return ('reset', snapshot, None)
+        # A new version may only differ in columns the table does not show (IV, bid/ask)
+        return ('delta', snapshot, rows) if len(rows) else None
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                with span('live_poll'):
+                    snapshot = self.poll()
+            except Exception as e:
+                snapshot = None
+                logger.debug("Live poll of %s %s failed: %s", self.ticker, self.expiry, e)
+            with self.hub.lock:
+                if not self.subscribers:
+                    del self.hub.feeds[(self.ticker, self.expiry)]
+                    return
+                if snapshot is not None and (self.snapshot is None or snapshot.version != self.snapshot.version):
+                    update = self._update(snapshot)
+                    if update is not None:
+                        self.publish(update)
+                        METRICS.inc('live_updates_total', amount=len(self.subscribers), kind=update[0])
+                    self.snapshot = snapshot
+            if self.hub.stopped.wait(max(self.hub.interval - (time.monotonic() - started), 0)):
+                return
+
+
+class LiveHub:
+    """Live feeds by (ticker, expiry): one poller per expiry however many clients follow it"""
+
+    def __init__(self, interval, max_subscribers):
+        self.interval = interval
+        self.max_subscribers = max_subscribers
+        self.feeds = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    @property
+    def subscribers(self):
+        with self.lock:
+            return sum(len(feed.subscribers) for feed in self.feeds.values())
+
+    def subscribe(self, ticker, expiry):
+        """Return (feed, update queue), or None when the process is at LIVE_MAX_SUBSCRIBERS"""
+        with self.lock:
+            if sum(len(feed.subscribers) for feed in self.feeds.values()) >= self.max_subscribers:
+                return None
+            feed = self.feeds.get((ticker, expiry))
+            if feed is None:
+                feed = self.feeds[(ticker, expiry)] = LiveFeed(self, ticker, expiry)
+                feed.thread.start()
+            updates = queue.Queue(LIVE_QUEUE_SIZE)
+            if feed.snapshot is not None:
+                updates.put_nowait(('snapshot', feed.snapshot, None))
+            feed.subscribers.add(updates)
+        return feed, updates
+
+    def unsubscribe(self, feed, updates):
+        with self.lock:
+            feed.subscribers.discard(updates)
+
+    def stop(self):
+        self.stopped.set()
+
 
-# Function to fetch and calculate options data
+LIVE_HUB = LiveHub(LIVE_INTERVAL, LIVE_MAX_SUBSCRIBERS)
+
+# Function to fetch options data for a strike range as a ChainSnapshot view
 def fetch_options_data(ticker, expiry, strike_min, strike_max):
-    print(f"[DEBUG] Fetching options data for {ticker} expiry {expiry} range {strike_min}-{strike_max}")
-    tk = yf.Ticker(ticker)
+    logger.debug("Fetching options data for %s expiry %s range %s-%s", ticker, expiry, strike_min, strike_max)
     try:
-        opt_chain = tk.option_chain(expiry)
-        calls = opt_chain.calls
-        puts = opt_chain.puts
-        print(f"[DEBUG] Calls shape: {calls.shape if hasattr(calls, 'shape') else 'N/A'}, Puts shape: {puts.shape if hasattr(puts, 'shape') else 'N/A'}")
+        snapshot = get_chain_snapshot(ticker, expiry)
+        logger.debug("Strikes: %s, Calls: %s, Puts: %s", len(snapshot), snapshot.has_calls, snapshot.has_puts)
     except Exception as e:
-        print(f"[DEBUG] Error fetching data for {ticker} {expiry}: {e}")
+        logger.warning("Error fetching data for %s %s: %s", ticker, expiry, e)
         return f"Error fetching data: {e}", None
 
-    if calls.empty and puts.empty:
-        print(f"[DEBUG] No options data available for {ticker} on {expiry}")
+    if not snapshot.has_calls and not snapshot.has_puts:
+        logger.debug("No options data available for %s on %s", ticker, expiry)
         return f"No options data available for {ticker} on {expiry}", None
 
-    df = pd.merge(calls, puts, on='strike', how='outer', suffixes=('_call', '_put'))
-    df = df[(df['strike'] >= strike_min) & (df['strike'] <= strike_max)].copy()
-
-    if df.empty:
-        print(f"[DEBUG] No options found in strike range {strike_min}-{strike_max} for {ticker}")
+    chain = snapshot.between(strike_min, strike_max)
+    if chain.empty:
+        logger.debug("No options found in strike range %s-%s for %s", strike_min, strike_max, ticker)
         return f"No options found in strike range {strike_min}-{strike_max} for {ticker}", None
 
-    # Calculate percentages
-    df['vC%'] = (df['volume_call'] / (df['volume_call'] + df['volume_put'])) * 100
-    df['vP%'] = 100 - df['vC%']
-    df['oiC%'] = (df['openInterest_call'] / (df['openInterest_call'] + df['openInterest_put'])) * 100
-    df['oiP%'] = 100 - df['oiC%']
+    logger.debug("Returning options data for %s %s", ticker, expiry)
+    return None, chain
 
-    # Select and rename columns for better display
-    df = df[['strike', 'volume_call', 'volume_put', 'vC%', 'vP%', 'openInterest_call', 'openInterest_put', 'oiC%', 'oiP%']]
-    df.columns = ['Strike', 'Call Vol', 'Put Vol', 'Call Vol %', 'Put Vol %', 'Call OI', 'Put OI', 'Call OI %', 'Put OI %']
-    
-    df = df.round(1).fillna('-')
-    print(f"[DEBUG] Returning options data table for {ticker} {expiry}")
-    return None, df.to_html(index=False, classes='table')
+# Function to share of a+b held by a, in percent (NaN where either side is missing or both are 0)
+def _percent_of_total(a, b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return a / (a + b) * 100
+
+# Function to format a ChainSnapshot view as the dashboard HTML table
+# `changes` (from history_changes) adds volume and OI change columns.
+def format_options_table(chain, changes=None):
+    import pandas as pd
+    vc_pct = _percent_of_total(chain.call_volume, chain.put_volume)
+    oic_pct = _percent_of_total(chain.call_oi, chain.put_oi)
+    columns = {
+        'Strike': chain.strikes,
+        'Call Vol': chain.call_volume,
+        'Put Vol': chain.put_volume,
+        'Call Vol %': vc_pct,
+        'Put Vol %': 100 - vc_pct,
+    }
+    if changes:
+        columns['Call ΔVol'] = changes['call_volume_change']
+        columns['Put ΔVol'] = changes['put_volume_change']
+    columns.update({
+        'Call OI': chain.call_oi,
+        'Put OI': chain.put_oi,
+        'Call OI %': oic_pct,
+        'Put OI %': 100 - oic_pct,
+    })
+    if changes:
+        columns['Call ΔOI'] = changes['call_oi_change']
+        columns['Put ΔOI'] = changes['put_oi_change']
+    df = pd.DataFrame(columns)
+    return df.round(1).to_html(index=False, classes='table', na_rep='-')
+
+# Function to get the time to expiry in years, measured to the 16:00 New York close on the expiry date
+def time_to_expiry(expiry, now=None):
+    close = datetime.strptime(expiry, '%Y-%m-%d').replace(hour=16, tzinfo=MARKET_TZ)
+    now = now or datetime.now(timezone.utc)
+    return max((close - now).total_seconds() / (365 * 24 * 3600), MIN_TIME_TO_EXPIRY)
+
+# Function to compute Black-Scholes gamma for arrays of strikes and vols.
+# `spot` may be a scalar or a column vector of price levels, which broadcasts to a levels x strikes grid.
+def black_scholes_gamma(spot, strikes, iv, t, r=RISK_FREE_RATE):
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        vol_sqrt_t = iv * np.sqrt(t)
+        d1 = (np.log(spot / strikes) + (r + 0.5 * iv * iv) * t) / vol_sqrt_t
+        gamma = np.exp(-0.5 * d1 * d1) / (np.sqrt(2 * np.pi) * spot * vol_sqrt_t)
+    # Missing or zero IV gives NaN/inf: such contracts carry no usable gamma
+    return np.where(np.isfinite(gamma), gamma, 0.0)
+
+
+class GammaExposure:
+    """Dealer gamma exposure by strike (gamma x OI x 100 x spot^2, calls positive, puts negative)"""
+
+    def __init__(self, strikes, call_gex, put_gex, spot, zero_gamma, call_wall, put_wall):
+        self.strikes = strikes
+        self.call_gex = call_gex
+        self.put_gex = put_gex
+        self.net_gex = call_gex + put_gex
+        self.spot = spot
+        self.zero_gamma = zero_gamma
+        self.call_wall = call_wall
+        self.put_wall = put_wall
+
+    @property
+    def total(self):
+        return float(self.net_gex.sum())
+
+    def between(self, strike_min, strike_max):
+        """Exposure restricted to a strike range; levels still describe the whole chain"""
+        lo = np.searchsorted(self.strikes, strike_min, side='left')
+        hi = np.searchsorted(self.strikes, strike_max, side='right')
+        return GammaExposure(self.strikes[lo:hi], self.call_gex[lo:hi], self.put_gex[lo:hi],
+                             self.spot, self.zero_gamma, self.call_wall, self.put_wall)
+
+
+# Function to find the spot level where total dealer gamma changes sign, nearest to spot.
+# Total gamma is evaluated on a coarse grid of hypothetical spot levels in one broadcast pass,
+# then on a fine grid inside the bracketing interval, and interpolated linearly.
+def zero_gamma_level(strikes, iv, signed_oi, spot, t):
+    if len(strikes) == 0:
+        return None
+
+    def total_gamma(levels):
+        return (black_scholes_gamma(levels[:, None], strikes, iv, t) @ signed_oi) * levels * levels
+
+    def nearest_crossing(levels, totals):
+        crossings = np.flatnonzero(np.signbit(totals[:-1]) != np.signbit(totals[1:]))
+        if len(crossings) == 0:
+            return None
+        return crossings[np.argmin(np.abs(levels[crossings] - spot))]
+
+    levels = np.linspace(spot * (1 - ZERO_GAMMA_RANGE), spot * (1 + ZERO_GAMMA_RANGE), ZERO_GAMMA_STEPS)
+    i = nearest_crossing(levels, total_gamma(levels))
+    if i is None:
+        return None
+    levels = np.linspace(levels[i], levels[i + 1], ZERO_GAMMA_STEPS)
+    totals = total_gamma(levels)
+    i = nearest_crossing(levels, totals)
+    if i is None:
+        return float(levels[0])
+    y0, y1 = totals[i], totals[i + 1]
+    return float(levels[i] - y0 * (levels[i + 1] - levels[i]) / (y1 - y0))
+
+# Function to compute gamma exposure for a whole chain in a single vectorized pass
+def compute_gamma_exposure(chain, spot, t):
+    call_oi = np.nan_to_num(chain.call_oi)
+    put_oi = np.nan_to_num(chain.put_oi)
+    call_iv = np.nan_to_num(chain.call_iv)
+    put_iv = np.nan_to_num(chain.put_iv)
+    scale = CONTRACT_MULTIPLIER * spot * spot
+    call_gex = black_scholes_gamma(spot, chain.strikes, call_iv, t) * call_oi * scale
+    put_gex = -black_scholes_gamma(spot, chain.strikes, put_iv, t) * put_oi * scale
 
-# Function to generate heatmap image as base64
-def generate_heatmap(df):
-    if df is None or df.empty:
+    # Only contracts with open interest matter for the flip level; stack both sides into one sweep
+    calls = call_oi > 0
+    puts = put_oi > 0
+    zero_gamma = zero_gamma_level(
+        np.concatenate([chain.strikes[calls], chain.strikes[puts]]),
+        np.concatenate([call_iv[calls], put_iv[puts]]),
+        np.concatenate([call_oi[calls], -put_oi[puts]]),
+        spot, t,
+    )
+    call_wall = float(chain.strikes[np.argmax(call_gex)]) if call_gex.any() else None
+    put_wall = float(chain.strikes[np.argmin(put_gex)]) if put_gex.any() else None
+    return GammaExposure(chain.strikes, call_gex, put_gex, spot, zero_gamma, call_wall, put_wall)
+
+# Function to compute the total intrinsic value paid to option holders if the underlying settles at
+# each strike. With strikes sorted, call payout at K_j is K_j * sum(call_oi[:j+1]) - sum((call_oi * K)[:j+1])
+# and put payout is sum((put_oi * K)[j:]) - K_j * sum(put_oi[j:]), so prefix sums give every strike in O(n).
+def settlement_payouts(strikes, call_oi, put_oi):
+    order = np.argsort(strikes, kind='stable')
+    strikes = np.asarray(strikes, dtype=float)[order]
+    call_oi = np.nan_to_num(np.asarray(call_oi, dtype=float)[order])
+    put_oi = np.nan_to_num(np.asarray(put_oi, dtype=float)[order])
+    call_payout = strikes * np.cumsum(call_oi) - np.cumsum(call_oi * strikes)
+    put_payout = np.cumsum((put_oi * strikes)[::-1])[::-1] - strikes * np.cumsum(put_oi[::-1])[::-1]
+    return strikes, call_payout + put_payout
+
+# Function to find max pain: the settlement strike with the smallest total payout (None without OI)
+def max_pain(strikes, call_oi, put_oi):
+    strikes, payouts = settlement_payouts(strikes, call_oi, put_oi)
+    if len(strikes) == 0 or not (np.nansum(call_oi) + np.nansum(put_oi)) > 0:
         return None
+    return float(strikes[np.argmin(payouts)])
+
+# Function to compute max pain over a whole chain snapshot
+def compute_max_pain(snapshot):
+    return max_pain(snapshot.strikes, snapshot.call_oi, snapshot.put_oi)
+
+# Function to fetch snapshots for several expiries concurrently; cached chains are reused and
+# expiries that fail to download are left out of the result
+def fetch_chain_snapshots(ticker, expiries):
+    def fetch(expiry):
+        try:
+            return get_chain_snapshot(ticker, expiry)
+        except Exception as e:
+            logger.warning("Error fetching data for %s %s: %s", ticker, expiry, e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=CHAIN_FETCH_WORKERS) as pool:
+        futures = [submit_with_context(pool, fetch, expiry) for expiry in expiries]
+        snapshots = [future.result() for future in futures]
+    return {expiry: snapshot for expiry, snapshot in zip(expiries, snapshots) if snapshot is not None}
+
+# Function to compute max pain for every listed expiry of a ticker (None where there is no data)
+def max_pain_by_expiry(ticker):
+    expiries = get_listed_expiries(ticker)
+    snapshots = fetch_chain_snapshots(ticker, expiries)
+    return {expiry: compute_max_pain(snapshots[expiry]) if expiry in snapshots else None for expiry in expiries}
+
+
+class AggregateExposure:
+    """OI, volume and gamma exposure by strike summed across expiries on their union strike grid"""
+
+    def __init__(self, strikes, call_oi, put_oi, call_volume, put_volume, call_gex, put_gex,
+                 spot, zero_gamma, expiries, weights):
+        self.strikes = strikes
+        self.call_oi = call_oi
+        self.put_oi = put_oi
+        self.call_volume = call_volume
+        self.put_volume = put_volume
+        self.call_gex = call_gex
+        self.put_gex = put_gex
+        self.net_gex = call_gex + put_gex
+        self.spot = spot
+        self.zero_gamma = zero_gamma
+        self.call_wall = float(strikes[np.argmax(call_gex)]) if call_gex.any() else None
+        self.put_wall = float(strikes[np.argmin(put_gex)]) if put_gex.any() else None
+        self.expiries = expiries
+        self.weights = weights
+
+    def between(self, strike_min, strike_max):
+        """GammaExposure-compatible view of a strike range, for charting"""
+        exposure = GammaExposure(self.strikes, self.call_gex, self.put_gex, self.spot,
+                                 self.zero_gamma, self.call_wall, self.put_wall)
+        return exposure.between(strike_min, strike_max)
+
+
+# Function to get per-expiry weights: 'none' counts every expiry fully, 'time' scales each by
+# 1/sqrt(days to expiry) so near-term positioning dominates
+def expiry_weights(times, weighting='none'):
+    if weighting == 'time':
+        return 1 / np.sqrt(np.maximum(times * 365, 1))
+    return np.ones_like(times)
+
+# Function to aggregate several expiries of one ticker in a single vectorized pass: every contract
+# is placed on the union strike grid with searchsorted and summed per strike with bincount
+def aggregate_exposure(snapshots, spot, weighting='none', now=None):
+    expiries = sorted(snapshots)
+    chains = [snapshots[expiry] for expiry in expiries]
+    times = np.array([time_to_expiry(expiry, now) for expiry in expiries])
+    weights = expiry_weights(times, weighting)
+    lengths = [len(chain) for chain in chains]
+
+    def stacked(column):
+        if not chains:
+            return np.empty(0)
+        return np.nan_to_num(np.concatenate([getattr(chain, column) for chain in chains]))
+
+    all_strikes = stacked('strikes')
+    grid = np.unique(all_strikes)
+    cols = np.searchsorted(grid, all_strikes)
+    t = np.repeat(times, lengths)
+    w = np.repeat(weights, lengths)
+
+    def by_strike(values):
+        return np.bincount(cols, weights=values * w, minlength=len(grid))
+
+    call_oi, put_oi = stacked('call_oi'), stacked('put_oi')
+    call_iv, put_iv = stacked('call_iv'), stacked('put_iv')
+    scale = CONTRACT_MULTIPLIER * spot * spot
+    call_gex = black_scholes_gamma(spot, all_strikes, call_iv, t) * call_oi * scale
+    put_gex = -black_scholes_gamma(spot, all_strikes, put_iv, t) * put_oi * scale
+
+    calls = call_oi > 0
+    puts = put_oi > 0
+    zero_gamma = zero_gamma_level(
+        np.concatenate([all_strikes[calls], all_strikes[puts]]),
+        np.concatenate([call_iv[calls], put_iv[puts]]),
+        np.concatenate([(call_oi * w)[calls], -(put_oi * w)[puts]]),
+        spot, np.concatenate([t[calls], t[puts]]),
+    )
+    return AggregateExposure(
+        grid, by_strike(call_oi), by_strike(put_oi), by_strike(stacked('call_volume')),
+        by_strike(stacked('put_volume')), by_strike(call_gex), by_strike(put_gex),
+        spot, zero_gamma, expiries, weights,
+    )
+
+# Function to fetch the snapshots to aggregate: the next `count` listed expiries with data, or all
+# of them for 0, never more than AGGREGATE_MAX_EXPIRIES. Expiries without data are skipped and
+# later ones fetched in their place.
+def select_aggregate_snapshots(ticker, count=0):
+    remaining = get_listed_expiries(ticker)
+    count = min(count, AGGREGATE_MAX_EXPIRIES) if count > 0 else AGGREGATE_MAX_EXPIRIES
+    snapshots = {}
+    while remaining and len(snapshots) < count:
+        batch = remaining[:count - len(snapshots)]
+        remaining = remaining[len(batch):]
+        for expiry, snapshot in fetch_chain_snapshots(ticker, batch).items():
+            if snapshot.has_calls or snapshot.has_puts:
+                snapshots[expiry] = snapshot
+    return snapshots
+
+# Function to pick the nearest `count` expiries of a ticker that have data, without validating
+# the whole list like get_available_expiries does; raises TimeoutError past `deadline`.
+# Expiries that have passed (e.g. in a list cached yesterday) or fail to download are skipped.
+def nearest_snapshots(ticker, count, deadline):
+    found = EXPIRY_CACHE.lookup(ticker)
+    expiries = found[0] if found is not None else upstream_call('options', PROVIDER.get_expiries, ticker)
+    today = datetime.now(MARKET_TZ).strftime('%Y-%m-%d')
+    snapshots = []
+    error = None
+    for expiry in sorted(e for e in expiries if e >= today):
+        if len(snapshots) >= count:
+            break
+        if time.monotonic() > deadline:
+            raise TimeoutError("timed out fetching chains")
+        try:
+            snapshot = get_chain_snapshot(ticker, expiry)
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            logger.debug("Skipping %s %s in scan: %s", ticker, expiry, e)
+            error = e
+            continue
+        if not snapshot.empty:
+            snapshots.append(snapshot)
+    if not snapshots and error is not None:
+        raise error
+    return snapshots
+
+# Function to total OI and volume per strike over several snapshots
+def combine_by_strike(snapshots):
+    strikes, index = np.unique(np.concatenate([snapshot.strikes for snapshot in snapshots]), return_inverse=True)
+    totals = {}
+    for name in ('call_volume', 'put_volume', 'call_oi', 'put_oi'):
+        values = np.nan_to_num(np.concatenate([snapshot.columns[name] for snapshot in snapshots]))
+        totals[name] = np.bincount(index, weights=values, minlength=len(strikes))
+    return strikes, totals
+
+# Function to find strikes trading unusually heavily against their open interest
+def unusual_strikes(strikes, totals):
+    found = []
+    for side in ('call', 'put'):
+        volume, oi = totals[f'{side}_volume'], totals[f'{side}_oi']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(oi > 0, volume / oi, np.inf)
+        for i in np.flatnonzero((volume >= SCAN_MIN_VOLUME) & (ratio >= SCAN_UNUSUAL_RATIO)):
+            found.append({'side': side, 'strike': float(strikes[i]), 'volume': float(volume[i]),
+                          'oi': float(oi[i]), 'ratio': None if np.isinf(ratio[i]) else round(float(ratio[i]), 2)})
+    found.sort(key=lambda row: row['volume'], reverse=True)
+    return found[:SCAN_UNUSUAL_LIMIT]
+
+# Function to compute the scan row for one ticker: put/call ratios, max pain, OI walls near spot
+# and unusual volume over the nearest `expiries` expiries
+def scan_ticker(ticker, spot, expiries=1, timeout=SCAN_TICKER_TIMEOUT):
+    start = time.monotonic()
+    snapshots = nearest_snapshots(ticker, expiries, start + timeout)
+    if not snapshots:
+        raise ValueError("No options data available")
+    strikes, totals = combine_by_strike(snapshots)
+    call_volume, put_volume = totals['call_volume'].sum(), totals['put_volume'].sum()
+    call_oi, put_oi = totals['call_oi'].sum(), totals['put_oi'].sum()
+    call_wall = put_wall = None
+    if spot:
+        near = np.flatnonzero(np.abs(strikes - spot) <= spot * SCAN_WALL_RANGE)
+        if len(near) and totals['call_oi'][near].max() > 0:
+            call_wall = float(strikes[near[np.argmax(totals['call_oi'][near])]])
+        if len(near) and totals['put_oi'][near].max() > 0:
+            put_wall = float(strikes[near[np.argmax(totals['put_oi'][near])]])
+    return {
+        'ticker': ticker,
+        'spot': spot,
+        'expiries': [snapshot.expiry for snapshot in snapshots],
+        'call_volume': float(call_volume),
+        'put_volume': float(put_volume),
+        'put_call_volume_ratio': round(float(put_volume / call_volume), 3) if call_volume else None,
+        'call_oi': float(call_oi),
+        'put_oi': float(put_oi),
+        'put_call_oi_ratio': round(float(put_oi / call_oi), 3) if call_oi else None,
+        'max_pain': compute_max_pain(snapshots[0]),
+        'call_oi_wall': call_wall,
+        'put_oi_wall': put_wall,
+        'unusual': unusual_strikes(strikes, totals),
+    }
+
+# Function to scan many tickers on a bounded pool, with upstream calls rate limited across the pool.
+# A ticker that fails or exceeds `timeout` gets a row with only `error` set; the scan carries on.
+def scan_tickers(tickers, expiries=1, workers=SCAN_WORKERS, rate=SCAN_RATE, timeout=SCAN_TICKER_TIMEOUT):
+    tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+    limiter = RateLimiter(rate, burst=max(workers, 1))
+    token = _upstream_limiter.set(limiter)
     try:
+        try:
+            prices = QUOTES.get_many(tickers)
+            for ticker, price in prices.items():
+                if price is not None:
+                    store_entry(PRICE_CACHE, ticker, price)
+        except Exception as e:
+            logger.warning("Scan quotes failed, continuing without spot prices: %s", e)
+            prices = {}
+
+        started = {}  # ticker -> monotonic start, for the per-ticker timeout
+
+        def run(ticker):
+            started[ticker] = time.monotonic()
+            return scan_ticker(ticker, prices.get(ticker), expiries, timeout)
+
+        rows = {}
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scan')
+        pending = {submit_with_context(pool, run, ticker): ticker for ticker in tickers}
+        while pending:
+            done, _ = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            for future in done:
+                ticker = pending.pop(future)
+                try:
+                    rows[ticker] = future.result()
+                except Exception as e:
+                    rows[ticker] = {'ticker': ticker, 'error': str(e) or type(e).__name__}
+            now = time.monotonic()
+            for future, ticker in list(pending.items()):
+                if ticker in started and now - started[ticker] > timeout:
+                    # Abandon it: the worker finishes its current call in the background
+                    del pending[future]
+                    rows[ticker] = {'ticker': ticker, 'error': f"timed out after {timeout:g}s"}
+        pool.shutdown(wait=False, cancel_futures=True)
+    finally:
+        _upstream_limiter.reset(token)
+    return [rows[ticker] for ticker in tickers]
+
+SCAN_FIELDS = ('ticker', 'spot', 'expiries', 'call_volume', 'put_volume', 'put_call_volume_ratio', 'call_oi',
+               'put_oi', 'put_call_oi_ratio', 'max_pain', 'call_oi_wall', 'put_oi_wall', 'unusual', 'error')
+
+# Function to write scan rows as CSV; list fields are flattened to ';'-separated text
+def scan_rows_to_csv(rows, out):
+    writer = csv.DictWriter(out, fieldnames=SCAN_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        flat = dict(row)
+        if 'expiries' in flat:
+            flat['expiries'] = ';'.join(flat['expiries'])
+        if 'unusual' in flat:
+            flat['unusual'] = ';'.join(f"{u['side'][0].upper()}{u['strike']:g} vol {u['volume']:.0f} oi {u['oi']:.0f}"
+                                       for u in flat['unusual'])
+        writer.writerow(flat)
+
+# Function to merge adjacent strikes into at most `max_bins` bins holding equal numbers of
+# strikes, summing each value array per bin. Returns the first and last strike of every bin and
+# the summed arrays; strikes pass through unchanged when there are no more than `max_bins`.
+def bin_strikes(strikes, max_bins, *values):
+    values = [np.nan_to_num(np.asarray(v, dtype=float)) for v in values]
+    if len(strikes) <= max_bins:
+        return strikes, strikes, values
+    edges = np.linspace(0, len(strikes), max(max_bins, 1) + 1).astype(int)
+    starts = edges[:-1]
+    return strikes[starts], strikes[edges[1:] - 1], [np.add.reduceat(v, starts) for v in values]
+
+# Function to save a figure in the requested format (png, svg or webp) and return the bytes
+def save_figure(fig, fmt, dpi):
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi)
+    return buf.getvalue()
+
+# Function to render the strike volume heatmap (runs inside a render worker).
+# Strikes are binned to the pixel width, so render time and image size do not grow with the range.
+def render_heatmap(strikes, call_volume, put_volume, width=CHART_WIDTH, dpi=CHART_DPI, fmt='png'):
+    import pandas as pd
+    Figure, sns = load_plotting()
+    try:
+        height = max(width * 0.3, 5 * dpi)
+        lows, highs, (call_volume, put_volume) = bin_strikes(
+            np.asarray(strikes, dtype=float), int(width * 0.85 / CHART_MIN_BAR_PX), call_volume, put_volume)
+        if lows is highs:
+            labels = pd.Index(lows, name='Strike')
+        else:
+            labels = pd.Index([f'{lo:g}-{hi:g}' for lo, hi in zip(lows, highs)], name='Strike')
         # Prepare data for heatmap
-        heatmap_data = df[['Strike', 'Call Vol', 'Put Vol']].copy()
-        heatmap_data = heatmap_data.replace('-', 0)
-        heatmap_data['Call Vol'] = pd.to_numeric(heatmap_data['Call Vol'], errors='coerce').fillna(0)
-        heatmap_data['Put Vol'] = pd.to_numeric(heatmap_data['Put Vol'], errors='coerce').fillna(0)
-        heatmap_data = heatmap_data.set_index('Strike')
-        # Create heatmap
-        plt.figure(figsize=(min(1.5 * len(heatmap_data), 24), 6))
+        heatmap_data = pd.DataFrame({'Call Vol': call_volume, 'Put Vol': put_volume}, index=labels)
+        # Create heatmap on a standalone figure, no pyplot global state
+        fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        ax = fig.subplots()
         sns.heatmap(
             heatmap_data.T,
             cmap='YlOrRd',
             annot=False,
             fmt='.0f',
             cbar=True,
-            linewidths=0.5,
-            square=False
+            # Cell borders only while cells are wide enough for them to read as gaps
+            linewidths=0.5 if width / len(heatmap_data) >= 4 * CHART_MIN_BAR_PX else 0,
+            square=False,
+            ax=ax
         )
-        plt.title('Call/Put Volume Heatmap by Strike', fontsize=18)
-        plt.yticks(rotation=0, fontsize=14)
-        plt.xticks(fontsize=12)
-        plt.xlabel('Strike', fontsize=16)
-        plt.ylabel('', fontsize=16)
-        plt.tight_layout(rect=[0, 0, 1, 0.95])
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png')
-        plt.close()
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        return img_base64
+        ax.set_title('Call/Put Volume Heatmap by Strike', fontsize=18)
+        ax.tick_params(axis='y', labelrotation=0, labelsize=14)
+        ax.tick_params(axis='x', labelsize=12)
+        ax.set_xlabel('Strike', fontsize=16)
+        ax.set_ylabel('', fontsize=16)
+        fig.tight_layout(rect=[0, 0, 1, 0.95])
+        return save_figure(fig, fmt, dpi)
     except Exception as e:
-        print(f"Error generating heatmap: {e}")
+        logger.warning("Error generating heatmap: %s", e)
         return None
 
-# Function to generate GEX-style bar chart as base64
-def generate_gex_chart(df, spot_price=None, max_pain=None):
-    if df is None or df.empty:
-        return None
+# Function to render the GEX-style bar chart (runs inside a render worker).
+# Strikes are binned to the chart's pixel height, and only as many bars are labelled as fit.
+def render_gex_chart(strikes, gex, spot_price=None, max_pain=None, zero_gamma=None, call_wall=None, put_wall=None,
+                     title='Gamma Exposure (GEX) by Strike', width=CHART_WIDTH, dpi=CHART_DPI, fmt='png'):
+    Figure, _ = load_plotting()
     try:
-        # Use fallback for open interest columns
-        if 'Call OI' in df.columns and 'Put OI' in df.columns:
-            call_oi = pd.to_numeric(df['Call OI'], errors='coerce').fillna(0)
-            put_oi = pd.to_numeric(df['Put OI'], errors='coerce').fillna(0)
-            strikes = df['Strike']
-        elif 'openInterest_call' in df.columns and 'openInterest_put' in df.columns and 'strike' in df.columns:
-            call_oi = pd.to_numeric(df['openInterest_call'], errors='coerce').fillna(0)
-            put_oi = pd.to_numeric(df['openInterest_put'], errors='coerce').fillna(0)
-            strikes = df['strike']
-        else:
-            print('No open interest columns found for GEX chart')
-            return None
-        gex = call_oi - put_oi  # Calls positive, puts negative
-        
-        # Create larger figure for better magnification
-        fig, ax = plt.subplots(figsize=(16, 12), dpi=150)
+        height = width * 0.75
+        lows, highs, (gex,) = bin_strikes(np.asarray(strikes, dtype=float),
+                                          int(height * 0.8 / CHART_MIN_BAR_PX), gex)
+        strikes = (lows + highs) / 2
+        spacing = np.min(np.diff(strikes)) if len(strikes) > 1 else 1.0  # bars fill 80% of the gap
+
+        # 4:3 figure sized in pixels; fonts are in points so `dpi` scales the text
+        fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        ax = fig.subplots()
         
         # Create horizontal bar chart
-        bars = ax.barh(strikes, gex, color=["#d62728" if v < 0 else "#2ca02c" for v in gex], alpha=0.7, height=0.8)
+        bars = ax.barh(strikes, gex, color=np.where(gex < 0, "#d62728", "#2ca02c"), alpha=0.7, height=0.8 * spacing)
         
         # Add zero line
         ax.axvline(0, color='black', linewidth=2)
@@ -344,30 +2490,24 @@ def generate_gex_chart(df, spot_price=None, max_pain=None):
                    color='purple', va='center', ha='right', fontsize=14, fontweight='bold',
                    bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
         
-        # Vol Trigger (closest strike above spot)
-        vol_trigger = None
-        y_wall = None
-        if spot_price is not None and len(strikes) > 0:
-            strikes_sorted = sorted(strikes)
-            vol_trigger = min([s for s in strikes_sorted if s >= spot_price], default=None)
-            y_wall = max([s for s in strikes_sorted if s <= spot_price], default=None)
-        
-        if vol_trigger:
-            ax.axhline(vol_trigger, color='gold', linestyle='-.', linewidth=3, label='Vol Trigger')
-            ax.text(ax.get_xlim()[1] * 0.95, vol_trigger, f'Vol Trigger: {vol_trigger}', 
-                   color='goldenrod', va='center', ha='right', fontsize=14, fontweight='bold',
-                   bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
-        
-        if y_wall:
-            ax.axhline(y_wall, color='blue', linestyle='-', linewidth=3, label='Y Wall')
-            ax.text(ax.get_xlim()[1] * 0.95, y_wall, f'Y Wall: {y_wall}', 
-                   color='blue', va='center', ha='right', fontsize=14, fontweight='bold',
+        # Zero gamma flip and the strikes with the largest call/put exposure
+        levels = [
+            (zero_gamma, 'Zero Gamma', 'gold', 'goldenrod', '-.'),
+            (call_wall, 'Call Wall', 'green', 'green', '-'),
+            (put_wall, 'Put Wall', 'blue', 'blue', '-'),
+        ]
+        for level, label, line_color, text_color, linestyle in levels:
+            if level is None:
+                continue
+            ax.axhline(level, color=line_color, linestyle=linestyle, linewidth=3, label=label)
+            ax.text(ax.get_xlim()[1] * 0.95, level, f'{label}: {level:.2f}', 
+                   color=text_color, va='center', ha='right', fontsize=14, fontweight='bold',
                    bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8))
         
         # Enhanced styling
-        ax.set_xlabel('GEX (Call OI - Put OI)', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Net Dealer GEX (gamma x OI x 100 x spot²)', fontsize=16, fontweight='bold')
         ax.set_ylabel('Strike Price', fontsize=16, fontweight='bold')
-        ax.set_title('Options Activity (GEX-style) by Strike', fontsize=18, fontweight='bold', pad=20)
+        ax.set_title(title, fontsize=18, fontweight='bold', pad=20)
         
         # Improve tick labels
         ax.tick_params(axis='both', which='major', labelsize=12)
@@ -376,100 +2516,234 @@ def generate_gex_chart(df, spot_price=None, max_pain=None):
         # Add legend with better positioning
         ax.legend(loc='lower right', fontsize=12, framealpha=0.9)
         
-        # Add value labels on bars for better readability
-        for i, (bar, value) in enumerate(zip(bars, gex)):
-            if abs(value) > max(gex) * 0.05:  # Only label significant bars
-                color = 'white' if abs(value) > max(gex) * 0.3 else 'black'
-                ax.text(value + (0.02 * max(gex) if value >= 0 else -0.02 * max(gex)), 
-                       bar.get_y() + bar.get_height()/2, 
-                       f'{int(value):,}', 
-                       ha='center' if value >= 0 else 'center',
-                       va='center', fontsize=10, fontweight='bold', color=color)
+        # Label significant bars (over 5% of the largest), largest first, as many as fit one
+        # 10pt line each; thresholds are computed once for all bars
+        magnitude = np.abs(gex)
+        peak = magnitude.max() if len(gex) else 0
+        if peak > 0:
+            max_labels = int(height * 0.8 / (10 * dpi / 72 * 1.2))
+            labelled = np.flatnonzero(magnitude > peak * 0.05)
+            labelled = labelled[np.argsort(-magnitude[labelled], kind='stable')][:max_labels]
+            offsets = np.where(gex[labelled] >= 0, 0.02, -0.02) * peak
+            colors = np.where(magnitude[labelled] > peak * 0.3, 'white', 'black')
+            for i, offset, color in zip(labelled, offsets, colors):
+                bar = bars[i]
+                ax.text(gex[i] + offset, bar.get_y() + bar.get_height() / 2, format_exposure(gex[i]),
+                        ha='center', va='center', fontsize=10, fontweight='bold', color=color)
         
-        plt.tight_layout()
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        plt.close()
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-        return img_base64
+        fig.tight_layout()
+        return save_figure(fig, fmt, dpi)
     except Exception as e:
-        print(f"Error generating GEX chart: {e}")
+        logger.warning("Error generating GEX chart: %s", e)
+        return None
+
+# Function to generate heatmap image bytes
+def generate_heatmap(chain, width=CHART_WIDTH, dpi=CHART_DPI, fmt='png'):
+    if chain is None or chain.empty:
+        return None
+    with span('render_heatmap'):
+        return RENDER_SERVICE.render(
+            render_heatmap, chain.strikes, np.nan_to_num(chain.call_volume), np.nan_to_num(chain.put_volume),
+            width, dpi, fmt
+        )
+
+# Function to format an exposure value compactly for bar labels, e.g. 1.2B or -350.0M
+def format_exposure(value):
+    for divisor, suffix in ((1e9, 'B'), (1e6, 'M'), (1e3, 'K')):
+        if abs(value) >= divisor:
+            return f'{value / divisor:,.1f}{suffix}'
+    return f'{value:,.0f}'
+
+# Function to generate the gamma exposure bar chart image bytes
+def generate_gex_chart(exposure, max_pain=None, title='Gamma Exposure (GEX) by Strike', width=CHART_WIDTH,
+                       dpi=CHART_DPI, fmt='png'):
+    if exposure is None or len(exposure.strikes) == 0:
         return None
+    with span('render_gex'):
+        return RENDER_SERVICE.render(
+            render_gex_chart, exposure.strikes, exposure.net_gex, exposure.spot, max_pain,
+            exposure.zero_gamma, exposure.call_wall, exposure.put_wall, title, width, dpi, fmt
+        )
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.stats = RequestStats()
+    g.stats_token = _request_stats.set(g.stats)
+
+# Function to record a finished request's latency and upstream calls; streamed responses
+# call it when their body is complete, everything else from the after_request hook
+def finish_request_metrics():
+    if 'request_start' in g:
+        endpoint = request.endpoint or 'unknown'
+        METRICS.observe('request_duration_seconds', time.perf_counter() - g.request_start, endpoint=endpoint)
+        METRICS.observe('upstream_calls_per_request', g.stats.upstream_calls, endpoint=endpoint)
+
+@app.after_request
+def record_request_metrics(response):
+    if response.is_streamed:
+        return response  # headers go out before the body is generated; see finish_request_metrics
+    if 'request_start' in g:
+        finish_request_metrics()
+        if g.stats.data_age or g.stats.stale:
+            # Age of the oldest market data in the response, for clients and the JS on the page
+            response.headers['X-Data-Age'] = str(int(g.stats.data_age))
+            if g.stats.stale:
+                response.headers['X-Data-Stale'] = '1'
+    return response
+
+@app.teardown_request
+def reset_request_metrics(exc=None):
+    if 'stats_token' in g:
+        _request_stats.reset(g.stats_token)
 
 @app.route('/', methods=['GET'])
 def dashboard():
     ticker = request.args.get('ticker', 'SPY').upper()
     expiry = request.args.get('expiry', '')
     strike_range = request.args.get('range', '')
-    
-    error = None
-    info = None
-    table = None
-    current_price = None
-    available_expiries = []
-    heatmap_img = None
-    
-    # Get available expiries for the ticker (even if empty initially)
-    if ticker:
-        available_expiries = get_available_expiries(ticker)
-        
-        if not available_expiries:
-            error = f"Unable to fetch options data for {ticker}. This could be due to:\n- Invalid ticker symbol\n- No options available for this stock\n- Temporary API issues\n\nPlease try:\n- Checking the ticker symbol spelling\n- Using a different ticker (e.g., SPY, AAPL, TSLA)\n- Refreshing the page in a few minutes"
-        else:
-            # Get current price
-            current_price = get_current_price(ticker)
-            
-            # Set default expiry if not provided or if provided expiry is not in available list
-            if not expiry or expiry not in available_expiries:
-                expiry = available_expiries[0]
-            
-            # Set default strike range if not provided
-            if not strike_range and current_price:
-                # Default to ±10% of current price
-                min_strike = max(0, current_price * 0.9)
-                max_strike = current_price * 1.1
-                strike_range = f"{int(min_strike)}-{int(max_strike)}"
-            elif not strike_range:
-                strike_range = "100-200"  # Generic default
-            
-            try:
-                strike_min, strike_max = map(float, strike_range.split('-'))
-                error, table = fetch_options_data(ticker, expiry, strike_min, strike_max)
-                
-                if not error and table:
+    agg_expiries = request.args.get('agg_expiries', AGGREGATE_DEFAULT_EXPIRIES, type=int)
+    agg_weight = request.args.get('agg_weight', 'none')
+    # Started by the first page view, not by health checks or metrics scrapes
+    PREFETCHER.ensure_started()
+    PREFETCHER.note_request(ticker)
+
+    # Spot price and, when the expiry is already known, its chain are fetched alongside the
+    # expiry list instead of after it
+    price_future = submit_with_context(PAGE_EXECUTOR, get_current_price, ticker)
+    chain_future = submit_with_context(PAGE_EXECUTOR, get_chain_snapshot, ticker, expiry) if expiry else None
+
+    def generate():
+        nonlocal expiry, strike_range
+        try:
+            yield PAGE_HEAD.render(ticker=ticker)
+
+            error = None
+            info = None
+            table = None
+            chain = None
+            current_price = None
+            available_expiries = get_available_expiries(ticker)
+
+            if not available_expiries:
+                error = f"Unable to fetch options data for {ticker}. This could be due to:\n- Invalid ticker symbol\n- No options available for this stock\n- Temporary API issues\n\nPlease try:\n- Checking the ticker symbol spelling\n- Using a different ticker (e.g., SPY, AAPL, TSLA)\n- Refreshing the page in a few minutes"
+            else:
+                current_price = price_future.result()
+
+                # Set default expiry if not provided or if provided expiry is not in available list
+                if not expiry or expiry not in available_expiries:
+                    expiry = available_expiries[0]
+
+                # Set default strike range if not provided
+                if not strike_range and current_price:  # None (unavailable) or 0 both fall back
+                    # Default to ±10% of current price
+                    min_strike = max(0, current_price * 0.9)
+                    max_strike = current_price * 1.1
+                    strike_range = f"{int(min_strike)}-{int(max_strike)}"
+                elif not strike_range:
+                    strike_range = "100-200"  # Generic default
+
+            yield PAGE_FORM.render(ticker=ticker, expiry=expiry, strike_range=strike_range,
+                                   current_price=current_price, available_expiries=available_expiries,
+                                   agg_expiries=agg_expiries, agg_weight=agg_weight)
+
+            if available_expiries:
+                if chain_future is not None:
+                    # Let the early download finish rather than starting a second one
+                    wait([chain_future])
+                try:
+                    strike_min, strike_max = parse_strike_range(strike_range)
+                except ValueError:
+                    error = "Invalid strike range format. Please use format like '150-200'"
+                else:
+                    error, chain = fetch_options_data(ticker, expiry, strike_min, strike_max)
+
+                if not error and chain is not None:
                     info = f"Showing options data for {ticker} expiring {expiry} with strikes {strike_min}-{strike_max}"
-                    # Get the DataFrame for heatmap
-                    _, df_html = fetch_options_data(ticker, expiry, strike_min, strike_max)
-                    # Re-fetch as DataFrame for heatmap
-                    tk = yf.Ticker(ticker)
-                    opt_chain = tk.option_chain(expiry)
-                    calls = opt_chain.calls
-                    puts = opt_chain.puts
-                    df = pd.merge(calls, puts, on='strike', how='outer', suffixes=('_call', '_put'))
-                    df = df[(df['strike'] >= strike_min) & (df['strike'] <= strike_max)].copy()
-                    if not df.empty:
-                        df['Call Vol'] = df['volume_call']
-                        df['Put Vol'] = df['volume_put']
-                        df['Strike'] = df['strike']
-                        heatmap_img = generate_heatmap(df[['Strike', 'Call Vol', 'Put Vol']])
-                        # GEX chart is now served from separate endpoint
-                        # No need to generate gex_img here
-            except ValueError:
-                error = "Invalid strike range format. Please use format like '150-200'"
-    
-    return render_template_string(
-        TEMPLATE, 
-        ticker=ticker, 
-        expiry=expiry, 
-        strike_range=strike_range, 
-        table=table, 
-        error=error, 
-        info=info,
-        current_price=current_price,
-        available_expiries=available_expiries,
-        heatmap_img=heatmap_img
-    )
+                    try:
+                        history = history_changes(chain)
+                    except Exception:
+                        # A corrupt or unreadable capture only costs the Δ columns, never the table
+                        logger.exception("History lookup failed for %s %s", ticker, expiry)
+                        history = None
+                    if history:
+                        info += f"; Δ columns compare with {history[0].strftime('%Y-%m-%d %H:%M')} ET"
+                    with span('table_html'):
+                        table = format_options_table(chain, history[1] if history else None)
+                    # Heatmap and GEX chart are served from their own cached image endpoints
+
+            with span('page_render'):
+                yield PAGE_RESULTS.render(ticker=ticker, expiry=expiry, strike_range=strike_range, table=table,
+                                          error=error, info=info, agg_expiries=agg_expiries, agg_weight=agg_weight,
+                                          data_age=int(g.stats.data_age), data_stale=g.stats.stale)
+        finally:
+            finish_request_metrics()
+
+    # text/html chunks are flushed as they are yielded; no buffering proxies should hold them back
+    response = Response(stream_with_context(generate()), mimetype='text/html')
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# Function to parse a "min-max" strike range string
+def parse_strike_range(strike_range):
+    strike_min, strike_max = map(float, strike_range.split('-'))
+    return strike_min, strike_max
+
+# Function to parse the chart endpoints' output options (?width=&dpi=&format=png|svg|webp);
+# width and dpi are clamped to CHART_WIDTH_LIMITS and CHART_DPI_LIMITS
+def chart_params():
+    width = request.args.get('width', CHART_WIDTH, type=int)
+    dpi = request.args.get('dpi', CHART_DPI, type=int)
+    fmt = request.args.get('format', 'png').lower()
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(CHART_FORMATS)}")
+    width = min(max(width, CHART_WIDTH_LIMITS[0]), CHART_WIDTH_LIMITS[1])
+    dpi = min(max(dpi, CHART_DPI_LIMITS[0]), CHART_DPI_LIMITS[1])
+    return width, dpi, fmt
+
+# Function to serve a rendered chart from IMAGE_CACHE with a strong ETag.
+# `key` must change whenever the image would (chain version, range, overlays, output options),
+# so a matching If-None-Match is answered with 304 before anything is rendered.
+def chart_response(key, render, mimetype='image/png'):
+    etag = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        image = IMAGE_CACHE.get(key)
+        if image is None:
+            image = render()
+            if not image:
+                # Renderer saturated, timed out or failed: placeholder that the browser must not keep
+                response = Response(PLACEHOLDER_PNG, mimetype='image/png')
+                response.headers['Cache-Control'] = 'no-store'
+                return response
+            IMAGE_CACHE.set(key, image)
+        response = Response(image, mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={CHART_MAX_AGE}'
+    return response
+
+# Add a route to serve strike volume heatmap images
+@app.route('/heatmap/<ticker>/<expiry>')
+def heatmap_image(ticker, expiry):
+    try:
+        strike_range = request.args.get('range', '')
+        if not strike_range:
+            return "Missing strike range parameter", 400
+        strike_min, strike_max = parse_strike_range(strike_range)
+        width, dpi, fmt = chart_params()
+
+        snapshot = get_chain_snapshot(ticker, expiry)
+        chain = snapshot.between(strike_min, strike_max)
+        if chain.empty:
+            return "No data available", 404
+
+        key = ('heatmap', snapshot.ticker, expiry, strike_min, strike_max, snapshot.version, width, dpi, fmt)
+        return chart_response(key, lambda: generate_heatmap(chain, width, dpi, fmt), CHART_FORMATS[fmt])
+    except ValueError as e:
+        return f"Error: {str(e)}", 400
+    except Exception as e:
+        return f"Error: {str(e)}", 500
 
 # Add a route to serve GEX chart images
 @app.route('/gex_chart/<ticker>/<expiry>')
@@ -480,46 +2754,414 @@ def gex_chart_image(ticker, expiry):
         if not strike_range:
             return "Missing strike range parameter", 400
             
-        strike_min, strike_max = map(float, strike_range.split('-'))
+        strike_min, strike_max = parse_strike_range(strike_range)
+        width, dpi, fmt = chart_params()
         
-        # Fetch options data
-        tk = yf.Ticker(ticker)
-        opt_chain = tk.option_chain(expiry)
-        calls = opt_chain.calls
-        puts = opt_chain.puts
-        df = pd.merge(calls, puts, on='strike', how='outer', suffixes=('_call', '_put'))
-        df = df[(df['strike'] >= strike_min) & (df['strike'] <= strike_max)].copy()
+        # Fetch options data (shared with the dashboard request that embedded this chart)
+        snapshot = get_chain_snapshot(ticker, expiry)
+        chain = snapshot.between(strike_min, strike_max)
         
-        if df.empty:
+        if chain.empty:
             return "No data available", 404
-            
-        # Prepare data for GEX chart
-        df['Call Vol'] = df['volume_call']
-        df['Put Vol'] = df['volume_put']
-        df['Strike'] = df['strike']
         
         # Get current price
         current_price = get_current_price(ticker)
+        problem = spot_price_problem(current_price)
+        if problem:
+            return problem
         
-        # Calculate max pain
-        if 'openInterest_call' in df.columns and 'openInterest_put' in df.columns:
-            max_pain = df.loc[(df['openInterest_call'] - df['openInterest_put']).abs().idxmin(), 'strike']
-        else:
-            max_pain = None
-            
-        # Generate GEX chart
-        gex_img = generate_gex_chart(df, spot_price=current_price, max_pain=max_pain)
+        # Max pain is a property of the whole chain, not of the displayed range
+        pain_strike = compute_max_pain(snapshot)
         
-        if gex_img:
-            # Decode base64 and return as image
-            img_data = base64.b64decode(gex_img)
-            return Response(img_data, mimetype='image/png')
-        else:
-            return "Failed to generate chart", 500
+        # Exposure and its levels come from the whole chain, the chart shows the requested range
+        exposure = compute_gamma_exposure(snapshot, current_price, time_to_expiry(expiry))
+        
+        key = ('gex', snapshot.ticker, expiry, strike_min, strike_max, snapshot.version, current_price, pain_strike,
+               width, dpi, fmt)
+        return chart_response(key, lambda: generate_gex_chart(exposure.between(strike_min, strike_max), pain_strike,
+                                                              width=width, dpi=dpi, fmt=fmt), CHART_FORMATS[fmt])
             
+    except ValueError as e:
+        return f"Error: {str(e)}", 400
+    except Exception as e:
+        return f"Error: {str(e)}", 500
+
+# Function to parse the aggregate endpoints' shared query parameters
+def aggregate_params():
+    count = request.args.get('expiries', 0, type=int)
+    if count < 0:
+        raise ValueError("expiries must be 0 (all) or a positive count")
+    weighting = request.args.get('weight', 'none')
+    if weighting not in ('none', 'time'):
+        raise ValueError("weight must be 'none' or 'time'")
+    return count, weighting
+
+# Add a route returning exposure aggregated across expiries as JSON
+@app.route('/aggregate/<ticker>')
+def aggregate_json(ticker):
+    ticker = ticker.upper()
+    try:
+        count, weighting = aggregate_params()
+        current_price = get_current_price(ticker)
+        problem = spot_price_problem(current_price)
+        if problem:
+            return jsonify({'ticker': ticker, 'error': problem[0]}), problem[1]
+        snapshots = select_aggregate_snapshots(ticker, count)
+        if not snapshots:
+            return jsonify({'ticker': ticker, 'error': 'No options data available'}), 404
+        agg = aggregate_exposure(snapshots, current_price, weighting)
+        strike_range = request.args.get('range', '')
+        lo, hi = 0, len(agg.strikes)
+        if strike_range:
+            strike_min, strike_max = parse_strike_range(strike_range)
+            lo = np.searchsorted(agg.strikes, strike_min, side='left')
+            hi = np.searchsorted(agg.strikes, strike_max, side='right')
+    except ValueError as e:
+        return jsonify({'ticker': ticker, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'ticker': ticker, 'error': str(e)}), 500
+    return jsonify({
+        'ticker': ticker,
+        'spot': current_price,
+        'expiries': agg.expiries,
+        'weights': agg.weights.tolist(),
+        'zero_gamma': agg.zero_gamma,
+        'call_wall': agg.call_wall,
+        'put_wall': agg.put_wall,
+        'strike': agg.strikes[lo:hi].tolist(),
+        'call_oi': agg.call_oi[lo:hi].tolist(),
+        'put_oi': agg.put_oi[lo:hi].tolist(),
+        'call_volume': agg.call_volume[lo:hi].tolist(),
+        'put_volume': agg.put_volume[lo:hi].tolist(),
+        'net_gex': agg.net_gex[lo:hi].tolist(),
+        'data_age': int(g.stats.data_age),
+        'stale': g.stats.stale,
+    })
+
+# Add a route to serve the aggregated GEX chart image
+@app.route('/aggregate_chart/<ticker>')
+def aggregate_chart_image(ticker):
+    try:
+        strike_range = request.args.get('range', '')
+        if not strike_range:
+            return "Missing strike range parameter", 400
+        strike_min, strike_max = parse_strike_range(strike_range)
+        count, weighting = aggregate_params()
+        width, dpi, fmt = chart_params()
+
+        current_price = get_current_price(ticker)
+        problem = spot_price_problem(current_price)
+        if problem:
+            return problem
+        snapshots = select_aggregate_snapshots(ticker, count)
+        if not snapshots:
+            return "No data available", 404
+
+        versions = tuple((expiry, snapshot.version) for expiry, snapshot in sorted(snapshots.items()))
+        key = ('aggregate', ticker.upper(), strike_min, strike_max, weighting, versions, current_price, width, dpi, fmt)
+        title = f"Aggregate GEX by Strike ({len(snapshots)} expiries{', time-weighted' if weighting == 'time' else ''})"
+
+        def render():
+            agg = aggregate_exposure(snapshots, current_price, weighting)
+            return generate_gex_chart(agg.between(strike_min, strike_max), title=title, width=width, dpi=dpi, fmt=fmt)
+
+        return chart_response(key, render, CHART_FORMATS[fmt])
+    except ValueError as e:
+        return f"Error: {str(e)}", 400
     except Exception as e:
         return f"Error: {str(e)}", 500
 
+# Add a route returning max pain per expiry as JSON (all expiries, or one with ?expiry=)
+@app.route('/max_pain/<ticker>')
+def max_pain_json(ticker):
+    ticker = ticker.upper()
+    expiry = request.args.get('expiry')
+    try:
+        if expiry:
+            results = {expiry: compute_max_pain(get_chain_snapshot(ticker, expiry))}
+        else:
+            results = max_pain_by_expiry(ticker)
+    except Exception as e:
+        return jsonify({'ticker': ticker, 'error': str(e)}), 500
+    return jsonify({'ticker': ticker, 'max_pain': results,
+                    'data_age': int(g.stats.data_age), 'stale': g.stats.stale})
+
+ARROW_MIME = 'application/vnd.apache.arrow.stream'
+
+# Function to encode metadata plus named float arrays as one JSON object, arrays as lists;
+# NaN (e.g. no contract on that side of the strike) and infinities are written as null
+def columns_to_json(meta, arrays):
+    body = {**meta, 'columns': list(arrays)}
+    for name, array in arrays.items():
+        values = np.asarray(array, dtype=float)
+        body[name] = np.where(np.isfinite(values), values, None).tolist()
+    return json.dumps(body, allow_nan=False).encode('utf-8')
+
+# Function to encode a chain view as {"strike": [...], "<column>": [...]} plus metadata
+def chain_to_json(chain, columns):
+    meta = {'ticker': chain.ticker, 'expiry': chain.expiry, 'version': chain.version, 'fetched_at': chain.fetched_at}
+    return columns_to_json(meta, {'strike': chain.strikes, **{name: chain.columns[name] for name in columns}})
+
+# Function to encode a chain view as an Arrow IPC stream (requires pyarrow); NaN becomes null
+def chain_to_arrow(chain, columns):
+    import pyarrow as pa
+    fields = {'strike': pa.array(chain.strikes)}
+    for name in columns:
+        fields[name] = pa.array(chain.columns[name], from_pandas=True)
+    table = pa.table(fields, metadata={'ticker': chain.ticker, 'expiry': chain.expiry, 'version': chain.version})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+# Function to check whether an optional module can be imported
+def module_available(name):
+    try:
+        __import__(name)
+        return True
+    except ImportError:
+        return False
+
+# Function to pick the content-coding for an /api body: br (if brotli is installed) or gzip
+def negotiate_encoding():
+    offered = ['br', 'gzip'] if module_available('brotli') else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+# Function to compress a body with the negotiated content-coding
+def encode_body(body, encoding):
+    if encoding == 'br':
+        import brotli
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+# Function to serve an /api body from API_CACHE with a strong ETag, compressed as negotiated.
+# As with chart_response, `key` must change whenever the body would; the ETag also covers
+# the format and content-coding since those change the bytes sent.
+def api_response(key, build, mimetype='application/json'):
+    encoding = negotiate_encoding()
+    etag = hashlib.blake2b(repr((key, mimetype, encoding)).encode('utf-8'), digest_size=16).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        cache_key = (key, mimetype, encoding)
+        body = API_CACHE.get(cache_key)
+        if body is None:
+            with span('api_encode'):
+                body = encode_body(build(), encoding)
+            API_CACHE.set(cache_key, body)
+        response = Response(body, mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'  # always revalidate; unchanged data costs a 304
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return response
+
+# Add a route listing a ticker's valid expiries as JSON
+@app.route('/api/expiries/<ticker>')
+def api_expiries(ticker):
+    ticker = ticker.upper()
+    expiries = get_available_expiries(ticker)
+    if not expiries:
+        return jsonify({'ticker': ticker, 'error': 'No options data available'}), 404
+    key = ('expiries', ticker, tuple(expiries))
+    return api_response(key, lambda: json.dumps({'ticker': ticker, 'expiries': expiries}).encode('utf-8'))
+
+# Add a route returning one expiry's merged chain as column arrays: JSON by default, Arrow IPC
+# when the Accept header asks for it. ?range=<min>-<max> limits strikes, ?columns=a,b picks columns.
+@app.route('/api/chain/<ticker>/<expiry>')
+def api_chain(ticker, expiry):
+    ticker = ticker.upper()
+    try:
+        columns = [name.strip() for name in request.args.get('columns', '').split(',') if name.strip()]
+        unknown = [name for name in columns if name not in ChainSnapshot.COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}; available: {', '.join(ChainSnapshot.COLUMNS)}")
+        columns = columns or list(ChainSnapshot.COLUMNS)
+        strike_range = request.args.get('range', '')
+        strike_min, strike_max = parse_strike_range(strike_range) if strike_range else (-np.inf, np.inf)
+
+        mimetype = request.accept_mimetypes.best_match(['application/json', ARROW_MIME]) or 'application/json'
+        if mimetype == ARROW_MIME and not module_available('pyarrow'):
+            return jsonify({'ticker': ticker, 'error': 'Arrow output needs pyarrow installed on the server'}), 406
+
+        snapshot = get_chain_snapshot(ticker, expiry)
+        if not snapshot.has_calls and not snapshot.has_puts:
+            return jsonify({'ticker': ticker, 'error': 'No options data available'}), 404
+        chain = snapshot.between(strike_min, strike_max)
+    except ValueError as e:
+        return jsonify({'ticker': ticker, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'ticker': ticker, 'error': str(e)}), 500
+
+    key = ('chain', ticker, expiry, strike_min, strike_max, tuple(columns), snapshot.version)
+    encode = chain_to_arrow if mimetype == ARROW_MIME else chain_to_json
+    return api_response(key, lambda: encode(chain, columns), mimetype)
+
+# Add a route listing the stored history captures of one expiry
+@app.route('/api/history/<ticker>/<expiry>')
+def api_history(ticker, expiry):
+    ticker = ticker.upper()
+    if HISTORY is None:
+        return jsonify({'ticker': ticker, 'error': 'History store is disabled'}), 404
+    if not HistoryStore.valid_key(ticker, expiry):
+        return jsonify({'ticker': ticker, 'error': 'Invalid ticker or expiry format. Use e.g. SPY/2025-01-17'}), 400
+    captures = [captured_at.isoformat() for captured_at, _ in HISTORY.captures(ticker, expiry)]
+    return jsonify({'ticker': ticker, 'expiry': expiry, 'captures': captures})
+
+# Add a route returning OI and volume changes per strike since a stored capture, as column arrays.
+# ?since=YYYY-MM-DD or an ISO datetime picks the capture (default: previous day's last), ?range= limits strikes.
+@app.route('/api/chain_changes/<ticker>/<expiry>')
+def api_chain_changes(ticker, expiry):
+    ticker = ticker.upper()
+    if not HistoryStore.valid_key(ticker, expiry):
+        return jsonify({'ticker': ticker, 'error': 'Invalid ticker or expiry format. Use e.g. SPY/2025-01-17'}), 400
+    try:
+        strike_range = request.args.get('range', '')
+        strike_min, strike_max = parse_strike_range(strike_range) if strike_range else (-np.inf, np.inf)
+        since = request.args.get('since', '')
+        snapshot = get_chain_snapshot(ticker, expiry)
+        chain = snapshot.between(strike_min, strike_max)
+        history = history_changes(chain, since)
+        if history is None:
+            return jsonify({'ticker': ticker, 'error': 'No earlier capture stored for this expiry'}), 404
+    except ValueError as e:
+        return jsonify({'ticker': ticker, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'ticker': ticker, 'error': str(e)}), 500
+
+    captured_at, changes = history
+    meta = {'ticker': ticker, 'expiry': expiry, 'version': snapshot.version, 'compared_to': captured_at.isoformat()}
+    arrays = {'strike': chain.strikes, 'call_oi': chain.call_oi, 'put_oi': chain.put_oi, **changes}
+    key = ('chain_changes', ticker, expiry, strike_min, strike_max, snapshot.version, captured_at)
+    return api_response(key, lambda: columns_to_json(meta, arrays))
+
+# Add a route scanning a list of tickers (?tickers=SPY,QQQ,...; at most SCAN_MAX_TICKERS, with
+# ?expiries= clamped to 1..SCAN_MAX_EXPIRIES) and returning the rows as JSON or, with ?format=csv, CSV
+@app.route('/scan', methods=['GET', 'POST'])
+def scan():
+    tickers = [t for t in request.values.get('tickers', '').replace(' ', ',').split(',') if t.strip()]
+    if not tickers:
+        return jsonify({'error': 'Pass tickers=SPY,QQQ,...'}), 400
+    if len(tickers) > SCAN_MAX_TICKERS:
+        return jsonify({'error': f'At most {SCAN_MAX_TICKERS} tickers per request; use scan.py for larger scans'}), 400
+    expiries = min(max(request.values.get('expiries', 1, type=int), 1), SCAN_MAX_EXPIRIES)
+    start = time.perf_counter()
+    with span('scan'):
+        rows = scan_tickers(tickers, expiries=expiries)
+    if request.values.get('format') == 'csv':
+        out = io.StringIO()
+        scan_rows_to_csv(rows, out)
+        return Response(out.getvalue(), mimetype='text/csv')
+    return jsonify({'rows': rows, 'scanned': len(rows), 'failed': sum('error' in row for row in rows),
+                    'elapsed_seconds': round(time.perf_counter() - start, 2)})
+
+# Function to encode a live update as an SSE event limited to one subscriber's strike range;
+# None for a delta with no changed rows in the range. `label` is the strike as the table prints it.
+def live_event(kind, snapshot, rows, strike_min, strike_max):
+    if rows is None:
+        rows = np.arange(len(snapshot))
+    strikes = snapshot.strikes[rows]
+    rows = rows[(strikes >= strike_min) & (strikes <= strike_max)]
+    if kind == 'delta' and not len(rows):
+        return None
+    arrays = {'strike': snapshot.strikes[rows], 'label': np.round(snapshot.strikes[rows], 1)}
+    arrays.update((name, snapshot.columns[name][rows]) for name in LIVE_COLUMNS)
+    data = columns_to_json({'version': snapshot.version, 'fetched_at': snapshot.fetched_at}, arrays)
+    return f"event: {kind}\ndata: {data.decode('utf-8')}\n\n"
+
+# Add a route streaming live chain updates as Server-Sent Events (?range=min-max): a 'snapshot'
+# event with every row on connect, then 'delta' events carrying only the strikes that changed.
+# The stream is long-lived, so it is left out of the request latency metrics.
+@app.route('/live/<ticker>/<expiry>')
+def live_updates(ticker, expiry):
+    ticker = ticker.upper()
+    try:
+        strike_min, strike_max = parse_strike_range(request.args.get('range', ''))
+    except ValueError:
+        return "Invalid or missing strike range parameter", 400
+    if expiry not in get_available_expiries(ticker):
+        return "Unknown expiry", 404
+    subscription = LIVE_HUB.subscribe(ticker, expiry)
+    if subscription is None:
+        return "Live updates are at capacity, please refresh the page instead", 503
+    feed, updates = subscription
+
+    def events():
+        try:
+            yield f'retry: {int(LIVE_INTERVAL * 1000)}\n\n'
+            while True:
+                try:
+                    kind, snapshot, rows = updates.get(timeout=LIVE_KEEPALIVE)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                event = live_event(kind, snapshot, rows, strike_min, strike_max)
+                if event:
+                    yield event
+        finally:
+            LIVE_HUB.unsubscribe(feed, updates)
+
+    response = Response(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# Add a cheap health check for load balancers: no upstream calls, no heavy imports
+@app.route('/healthz')
+def healthz():
+    return jsonify({'status': 'ok', 'pid': os.getpid(), 'uptime_seconds': round(time.time() - PROCESS_START, 1)})
+
+# Function to pay one-off startup costs ahead of the first request: import the data and
+# plotting stacks, build the matplotlib font cache and prefetch the default tickers.
+# Run in the gunicorn master before forking (see gunicorn.conf.py) so every worker inherits it.
+def warm_up(tickers=None):
+    start = time.perf_counter()
+    import pandas  # noqa: F401
+    import yfinance  # noqa: F401
+    _render_worker_init()
+    if tickers is None:
+        tickers = [t for t in os.environ.get('WARMUP_TICKERS', 'SPY').split(',') if t.strip()]
+    for ticker in tickers:
+        ticker = ticker.strip().upper()
+        try:
+            expiries = get_available_expiries(ticker)
+            get_current_price(ticker)
+            logger.info("Warm-up prefetched %s (%d expiries)", ticker, len(expiries))
+        except Exception as e:
+            logger.warning("Warm-up prefetch failed for %s: %s", ticker, e)
+    logger.info("Warm-up finished in %.1fs", time.perf_counter() - start)
+
+# Add a route exposing in-process metrics in Prometheus text format
+@app.route('/metrics')
+def metrics():
+    caches = {'chain': CHAIN_CACHE, 'expiry': EXPIRY_CACHE, 'price': PRICE_CACHE, 'image': IMAGE_CACHE,
+              'api': API_CACHE}
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    breaker_state = UPSTREAM_BREAKER.state
+
+    def per_cache(field):
+        return [({'cache': name}, cache_stats[field]) for name, cache_stats in stats.items()]
+
+    collected = [
+        ('cache_hits_total', 'counter', 'Cache lookups served from memory', per_cache('hits')),
+        ('cache_misses_total', 'counter', 'Cache lookups that missed or found an expired entry', per_cache('misses')),
+        ('cache_stale_hits_total', 'counter', 'Expired entries served while a refresh ran', per_cache('stale_hits')),
+        ('cache_evictions_total', 'counter', 'Entries evicted to stay under the memory limit', per_cache('evictions')),
+        ('cache_hit_ratio', 'gauge', 'Hits over lookups since process start', per_cache('hit_ratio')),
+        ('cache_entries', 'gauge', 'Entries currently cached', per_cache('entries')),
+        ('cache_bytes', 'gauge', 'Estimated bytes currently cached', per_cache('bytes')),
+        ('render_queue_depth', 'gauge', 'Chart renders queued or running', [({}, RENDER_SERVICE.pending)]),
+        ('live_subscribers', 'gauge', 'Open live update streams', [({}, LIVE_HUB.subscribers)]),
+        ('prefetch_watchlist_size', 'gauge', 'Tickers kept warm by the prefetch scheduler',
+         [({}, len(PREFETCHER.watchlist()) if PREFETCHER.interval > 0 else 0)]),
+        ('upstream_breaker_state', 'gauge', 'Upstream circuit breaker state (1 for the current state)',
+         [({'state': state}, int(state == breaker_state)) for state in ('closed', 'open', 'half_open')]),
+    ]
+    return Response(METRICS.render(collected), mimetype='text/plain; version=0.0.4')
+
 # Run with: flask run (after setting FLASK_APP to this file)
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5050))
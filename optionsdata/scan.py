@@ -0,0 +1,63 @@
+"""Scan a watchlist of tickers for put/call ratios, max pain, OI walls and unusual volume.
+
+Usage:
+    python scan.py SPY QQQ AAPL
+    python scan.py --file tickers.txt --format csv --output scan.csv
+
+Uses the same fetching, caching and rate limiting as the dashboard (see SCAN_* settings).
+"""
+import argparse
+import json
+import sys
+import time
+
+import options_dashboard as od
+
+
+def read_tickers(args):
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            for line in f:
+                line = line.split('#', 1)[0]
+                tickers.extend(t for t in line.replace(',', ' ').split() if t)
+    return tickers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('tickers', nargs='*', help='tickers to scan')
+    parser.add_argument('--file', help='file with tickers, separated by whitespace or commas (# starts a comment)')
+    parser.add_argument('--expiries', type=int, default=1, help='nearest expiries summed per ticker (default 1)')
+    parser.add_argument('--workers', type=int, default=od.SCAN_WORKERS, help='tickers scanned concurrently')
+    parser.add_argument('--rate', type=float, default=od.SCAN_RATE, help='upstream calls per second (0 for no limit)')
+    parser.add_argument('--timeout', type=float, default=od.SCAN_TICKER_TIMEOUT, help='seconds per ticker')
+    parser.add_argument('--format', choices=('csv', 'json'), default='csv')
+    parser.add_argument('--output', help='write here instead of stdout')
+    args = parser.parse_args(argv)
+
+    tickers = read_tickers(args)
+    if not tickers:
+        parser.error('no tickers given')
+
+    start = time.perf_counter()
+    rows = od.scan_tickers(tickers, expiries=max(args.expiries, 1), workers=args.workers,
+                           rate=args.rate, timeout=args.timeout)
+    failed = sum('error' in row for row in rows)
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        if args.format == 'csv':
+            od.scan_rows_to_csv(rows, out)
+        else:
+            json.dump(rows, out, indent=2)
+            out.write('\n')
+    finally:
+        if args.output:
+            out.close()
+    print(f"Scanned {len(rows)} tickers ({failed} failed) in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 1 if rows and failed == len(rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
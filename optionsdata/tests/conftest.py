@@ -0,0 +1,8 @@
+"""Test settings, applied before options_dashboard is imported: no shared store or history files
+under instance/, no prefetch thread, charts rendered inline."""
+import os
+
+os.environ.setdefault('SHARED_STORE_PATH', '')
+os.environ.setdefault('HISTORY_DIR', '')
+os.environ.setdefault('PREFETCH_INTERVAL', '0')
+os.environ.setdefault('RENDER_WORKERS', '0')
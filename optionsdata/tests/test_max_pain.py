@@ -0,0 +1,20 @@
+"""max_pain against the brute-force reference in benchmarks/bench_max_pain.py, without the timings.
+
+Run from the optionsdata directory:
+
+    python -m pytest tests
+"""
+import numpy as np
+
+from benchmarks.bench_max_pain import check
+from options_dashboard import max_pain
+
+
+def test_matches_brute_force_on_random_chains():
+    assert check()
+
+
+def test_no_open_interest_has_no_answer():
+    strikes = np.array([100.0, 105.0, 110.0])
+    assert max_pain(strikes, np.zeros(3), np.full(3, np.nan)) is None
+    assert max_pain(np.array([]), np.array([]), np.array([])) is None
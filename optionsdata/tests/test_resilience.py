@@ -0,0 +1,113 @@
+"""Circuit breaker and stale-while-revalidate behaviour, against a FakeProvider that can fail or stall.
+
+Run from the optionsdata directory:
+
+    python -m pytest tests
+"""
+import threading
+import time
+
+import pytest
+
+import options_dashboard as od
+from benchmarks.fake_provider import FakeProvider, synthetic_fixture
+
+
+class FlakyProvider(FakeProvider):
+    """FakeProvider whose calls raise ConnectionError while `failing` is set"""
+
+    failing = False
+
+    def _fixture(self, ticker):
+        if self.failing:
+            self.calls += 1
+            raise ConnectionError("upstream down")
+        return super()._fixture(ticker)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = FlakyProvider([synthetic_fixture('SMALL', 50.0, n_expiries=2, n_strikes=20, seed=1)])
+    monkeypatch.setattr(od, 'PROVIDER', provider)
+    monkeypatch.setattr(od, 'UPSTREAM_BREAKER', od.CircuitBreaker(threshold=2, base_delay=0.1, max_delay=0.2))
+    return provider
+
+
+def wait_for_refresh(cache, key, timeout=5):
+    deadline = time.monotonic() + timeout
+    while (id(cache), key) in od._refreshing:
+        assert time.monotonic() < deadline, "background refresh never finished"
+        time.sleep(0.01)
+
+
+def test_breaker_opens_probes_and_backs_off(provider):
+    breaker = od.UPSTREAM_BREAKER
+    provider.failing = True
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            od.upstream_call('options', provider.get_expiries, 'SMALL')
+    assert breaker.state == 'open'
+    with pytest.raises(od.UpstreamUnavailable):
+        od.upstream_call('options', provider.get_expiries, 'SMALL')
+    assert provider.calls == 2  # rejected without reaching the upstream
+
+    time.sleep(0.15)
+    assert breaker.state == 'half_open'
+    breaker.before_call()  # the single probe is let through...
+    with pytest.raises(od.UpstreamUnavailable):
+        breaker.before_call()  # ...and everyone else waits for its outcome
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.open_until - time.monotonic() > 0.15  # delay doubled to 0.2s
+
+    time.sleep(0.25)
+    provider.failing = False
+    assert od.upstream_call('options', provider.get_expiries, 'SMALL')
+    assert breaker.state == 'closed'
+    assert breaker.trips == 0
+
+
+def test_bad_requests_do_not_open_the_breaker(provider):
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            od.upstream_call('option_chain', provider.get_option_chain, 'SMALL', '1999-01-01')
+    assert od.UPSTREAM_BREAKER.state == 'closed'
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(provider):
+    cache = od.TTLCache(0.05, stale_ttl=60)
+    key = ('SMALL', 'listed')
+    fetch = lambda: tuple(provider.get_expiries('SMALL'))
+    expiries = od.cached_fetch(cache, key, fetch)
+    assert provider.calls == 1
+
+    time.sleep(0.1)
+    provider.latency = 0.3
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(od.cached_fetch(cache, key, fetch)))
+               for _ in range(8)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - start < 0.3  # nobody waited for the upstream
+    assert results == [expiries] * 8
+
+    wait_for_refresh(cache, key)
+    assert provider.calls == 2
+    assert cache.lookup(key)[2]  # fresh again
+
+
+def test_failed_refresh_keeps_the_stale_entry(provider):
+    cache = od.TTLCache(0.05, stale_ttl=60)
+    key = ('SMALL', 'listed')
+    fetch = lambda: tuple(provider.get_expiries('SMALL'))
+    expiries = od.cached_fetch(cache, key, fetch)
+
+    time.sleep(0.1)
+    provider.failing = True
+    assert od.cached_fetch(cache, key, fetch) == expiries
+    wait_for_refresh(cache, key)
+    assert provider.calls == 2
+    assert cache.lookup(key)[0] == expiries
@@ -0,0 +1,71 @@
+"""Single-flight loads through the SQLite shared store, with a slow FakeProvider as the upstream.
+
+Run from the optionsdata directory:
+
+    python -m pytest tests
+"""
+import json
+import os
+import threading
+
+import options_dashboard as od
+from benchmarks.fake_provider import FakeProvider, synthetic_fixture
+
+
+def slow_provider():
+    return FakeProvider([synthetic_fixture('SMALL', 50.0, n_expiries=2, n_strikes=20, seed=1)], latency=0.3)
+
+
+def namespace(store):
+    return od.SharedNamespace(store, 'expiry', lambda value: json.dumps(value).encode(),
+                              lambda data: tuple(json.loads(data)))
+
+
+def load_concurrently(namespaces, provider):
+    """Load the same key through each namespace at once, each into its own cache like separate workers"""
+    caches = [od.TTLCache(60) for _ in namespaces]
+    fetch = lambda: tuple(provider.get_expiries('SMALL'))
+    results = [None] * len(namespaces)
+
+    def load(i):
+        results[i] = namespaces[i].load(caches[i], ('SMALL', 'listed'), fetch, lambda value: True, 60)
+
+    threads = [threading.Thread(target=load, args=(i,)) for i in range(len(namespaces))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, caches
+
+
+def test_two_threads_fetch_once(tmp_path):
+    provider = slow_provider()
+    shared = namespace(od.SharedStore(str(tmp_path / 'shared.sqlite'), lock_timeout=5))
+    results, caches = load_concurrently([shared, shared], provider)
+    assert provider.calls == 1
+    assert results[0] == results[1] == tuple(provider.get_expiries('SMALL'))
+    assert all(cache.get(('SMALL', 'listed')) == results[0] for cache in caches)
+
+
+def test_two_store_connections_fetch_once(tmp_path):
+    provider = slow_provider()
+    path = str(tmp_path / 'shared.sqlite')
+    stores = [od.SharedStore(path, lock_timeout=5), od.SharedStore(path, lock_timeout=5)]
+    results, _ = load_concurrently([namespace(store) for store in stores], provider)
+    assert provider.calls == 1
+    assert results[0] == results[1]
+
+
+def test_lock_of_a_dead_worker_expires(tmp_path):
+    store = od.SharedStore(str(tmp_path / 'shared.sqlite'), lock_timeout=0.2)
+    store.conn.execute("INSERT INTO locks VALUES ('expiry|SMALL|listed', 'gone:1', 0)")
+    provider = slow_provider()
+    results, _ = load_concurrently([namespace(store)], provider)
+    assert provider.calls == 1
+    assert results[0]
+
+
+def test_store_file_is_private(tmp_path):
+    path = str(tmp_path / 'shared.sqlite')
+    od.SharedStore(path, lock_timeout=5)
+    assert os.stat(path).st_mode & 0o777 == 0o600